@@ -1,3 +1,20 @@
-from portabletext_html.renderer import PortableTextRenderer, render
+from __future__ import annotations
 
-__all__ = ['PortableTextRenderer', 'render']
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from portabletext_html.renderer import PortableTextRenderer, render, render_json
+
+__all__ = ['PortableTextRenderer', 'render', 'render_json']
+
+
+def __getattr__(name: str) -> Any:
+    # The renderer is imported on first use, so importing a submodule, like the
+    # JSON decoding or the compiled document format, does not import all of it
+    if name in __all__:
+        from portabletext_html import renderer
+
+        return getattr(renderer, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,5 @@
+import sys
+
+from portabletext_html.cli import main
+
+sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+HTTP rendering service.
+
+An ASGI application exposing the renderer to non-Python services. It has no
+dependencies beyond an ASGI server, e.g. `uvicorn portabletext_html.asgi:app`.
+
+    POST /render         JSON document in, HTML out
+    POST /render/batch   NDJSON documents in, NDJSON stream of HTML strings out
+
+Responses to /render carry an ETag derived from the request body and renderer
+configuration. Requests with a matching If-None-Match header get a 304 without
+anything being rendered, and rendered results are kept in an in-process LRU.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+from portabletext_html.cache import LRUCache
+from portabletext_html.decoding import decode_json
+from portabletext_html.renderer import PortableTextRenderer
+
+if TYPE_CHECKING:
+    from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+    Scope = Dict[str, Any]
+    Message = Dict[str, Any]
+    Receive = Callable[[], Awaitable[Message]]
+    Send = Callable[[Message], Awaitable[None]]
+
+
+class RenderApp:
+    """
+    ASGI application rendering Portable Text to HTML.
+
+    :param cache_size: Number of rendered documents kept in memory.
+    :param renderer_options: Keyword arguments passed on to `PortableTextRenderer`.
+    """
+
+    def __init__(self, cache_size: int = 1024, **renderer_options: Any) -> None:
+        self.renderer_options = renderer_options
+        self.cache = LRUCache(maxsize=cache_size)
+        self._config = PortableTextRenderer([], **renderer_options)._stable_config_fingerprint()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI connection."""
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':  # pragma: no cover
+            return
+
+        if scope['path'] not in ('/render', '/render/batch'):
+            await _respond(send, 404, b'Not found')
+            return
+        if scope['method'] != 'POST':
+            await _respond(send, 405, b'Method not allowed', [(b'allow', b'POST')])
+            return
+
+        body = await _read_body(receive)
+        if scope['path'] == '/render':
+            await self._render(scope, body, send)
+        else:
+            await self._render_batch(body, send)
+
+    def get_etag(self, body: bytes) -> str:
+        """Return the ETag for a request body."""
+        digest = hashlib.sha256(self._config.encode() + b'\n' + body).hexdigest()
+        return f'"{digest[:32]}"'
+
+    def render(self, body: bytes) -> str:
+        """Render a JSON document, using the in-process cache."""
+        etag = self.get_etag(body)
+        html = self.cache.get(etag)
+        if html is None:
+            html = PortableTextRenderer(decode_json(body), **self.renderer_options).render()
+            self.cache.set(etag, html)
+        return html
+
+    async def _render(self, scope: Scope, body: bytes, send: Send) -> None:
+        etag = self.get_etag(body)
+        if_none_match = {tag.strip() for tag in _get_header(scope, b'if-none-match').split(',')}
+        if etag in if_none_match or '*' in if_none_match:
+            await _respond(send, 304, b'', [(b'etag', etag.encode())])
+            return
+
+        try:
+            html = await _run_in_thread(self.render, body)
+        except Exception as e:
+            # Any error may be caused by the document, e.g. a KeyError for an unknown style
+            await _respond(send, 422, _describe_error(e).encode())
+            return
+        await _respond(
+            send, 200, html.encode(), [(b'content-type', b'text/html; charset=utf-8'), (b'etag', etag.encode())]
+        )
+
+    async def _render_batch(self, body: bytes, send: Send) -> None:
+        await send(
+            {'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'application/x-ndjson')]}
+        )
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                result: Any = await _run_in_thread(self.render, line)
+            except Exception as e:
+                result = {'error': _describe_error(e)}
+            chunk = json.dumps(result).encode() + b'\n'
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _run_in_thread(func: Callable[[bytes], str], body: bytes) -> str:
+    return await asyncio.get_running_loop().run_in_executor(None, func, body)
+
+
+async def _respond(send: Send, status: int, body: bytes, headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+    headers = [*(headers or []), (b'content-length', str(len(body)).encode())]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _describe_error(error: Exception) -> str:
+    return f'{type(error).__name__}: {error}'
+
+
+def _get_header(scope: Scope, name: bytes) -> str:
+    for key, value in scope.get('headers', []):
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return ''
+
+
+app = RenderApp()
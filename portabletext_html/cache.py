@@ -0,0 +1,248 @@
+"""
+Caching helpers.
+
+All caches are bounded LRUs that are safe to share between renderers and threads.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from portabletext_html.references import get_referenced
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+    from portabletext_html.types import Block
+
+_MISSING = object()
+_KEYLESS_TYPES = ('block', 'span', 'list')  # node types whose `_key` does not affect the output
+
+
+def fingerprint(obj: Any) -> str:
+    """Return a stable hash for a JSON-like object.
+
+    Dict key order does not affect the result, so equal content always maps to the same fingerprint.
+    """
+    data = json.dumps(obj, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def content_fingerprint(node: dict) -> str:
+    """
+    Return a stable hash for the content of a node, ignoring the `_key` values the renderer ignores.
+
+    Keys are only dropped from block, span and list nodes. Keys of `markDefs` entries are
+    kept, since spans refer to them through their marks, and so are keys of custom nodes,
+    since their serializers may include them in the output.
+    """
+    return fingerprint(_without_keys(node))
+
+
+def _without_keys(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        if obj.get('_type') not in _KEYLESS_TYPES:
+            return obj
+        return {
+            key: value if key == 'markDefs' else _without_keys(value) for key, value in obj.items() if key != '_key'
+        }
+    if isinstance(obj, list):
+        return [_without_keys(value) for value in obj]
+    return obj
+
+
+def describe_callable(value: Any) -> str:
+    """
+    Return the qualified name of a marker definition or serializer.
+
+    Instances set up with arguments are only told apart by an optional `cache_key`
+    attribute, a JSON-like value describing their setup, which is included when set.
+    """
+    name = getattr(value, '__qualname__', None) or type(value).__qualname__
+    description = f'{getattr(value, "__module__", "")}.{name}'
+    cache_key = None if isinstance(value, type) else getattr(value, 'cache_key', None)
+    if cache_key is not None:
+        description += f':{fingerprint(cache_key)}'
+    return description
+
+
+@dataclass
+class CacheStats:
+    """Counters for a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the share of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with an optional time-to-live."""
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: Optional[float] = None, timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._timer = timer
+        self._data: OrderedDict[Hashable, Tuple[Any, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default when it is missing or expired."""
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        expires = self._timer() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.stats = CacheStats()
+
+    def _lookup(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self._timer():
+                del self._data[key]
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+
+class SerializerCache(LRUCache):
+    """
+    Memoize custom serializer output.
+
+    Entries are keyed by the serializer, a fingerprint of the node, the block context
+    and the list_item flag, so serializers that look at their context are cached correctly.
+
+    :param types: Only cache these node types. All types are cached when not set.
+    :param exclude: Never cache these node types.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        types: Optional[Iterable[str]] = None,
+        exclude: Iterable[str] = (),
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl, timer=timer)
+        self.types = set(types) if types is not None else None
+        self.exclude = set(exclude)
+        self.stats_by_type: Dict[str, CacheStats] = {}
+
+    def is_cached_type(self, node_type: str) -> bool:
+        """Check whether output for the given node type should be cached."""
+        return node_type not in self.exclude and (self.types is None or node_type in self.types)
+
+    def render(
+        self,
+        serializer: Callable[[dict, Optional[Block], bool], str],
+        node: dict,
+        context: Optional[Block],
+        list_item: bool,
+    ) -> str:
+        """Return the serializer output for node, calling the serializer only on a cache miss."""
+        node_type = node.get('_type', '')
+        if not self.is_cached_type(node_type):
+            return serializer(node, context, list_item)
+
+        # Keyed on the serializer itself rather than its id, which may be reused once it is garbage collected
+        key = (
+            node_type,
+            serializer,
+            fingerprint(node),
+            _context_fingerprint(context),
+            _references_fingerprint(node, context),
+            list_item,
+        )
+        result = self._lookup(key)
+        with self._lock:
+            type_stats = self.stats_by_type.setdefault(node_type, CacheStats())
+            if result is not _MISSING:
+                type_stats.hits += 1
+                return result
+            type_stats.misses += 1
+
+        result = serializer(node, context, list_item)
+        self.set(key, result)
+        return result
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        super().clear()
+        with self._lock:
+            self.stats_by_type = {}
+
+
+def _context_fingerprint(context: Optional[Block]) -> Optional[str]:
+    if context is None:
+        return None
+    return fingerprint(
+        {
+            'style': context.style,
+            'level': context.level,
+            'listItem': context.listItem,
+            'children': context.children,
+            'markDefs': context.markDefs,
+        }
+    )
+
+
+def _references_fingerprint(node: dict, context: Optional[Block]) -> Optional[str]:
+    if context is None or not context.references:
+        return None
+    return fingerprint(get_referenced(node, context.references))
+
+
+class FragmentCache(LRUCache):
+    """
+    Reuse rendered HTML of top-level blocks and list groups across documents.
+
+    Fragments are keyed by the content of the node, ignoring `_key` values, together
+    with the renderer configuration. This makes shared boilerplate like disclaimers
+    or footers render once, even when each copy has its own keys.
+    """
+
+    def render(self, node: dict, config: Hashable, list_item: bool, render: Callable[[], str]) -> str:
+        """Return the cached fragment for node, calling render on a cache miss."""
+        key = (config, list_item, content_fingerprint(node))
+        result = self.get(key)
+        if result is None:
+            result = render()
+            self.set(key, result)
+        return result
@@ -0,0 +1,137 @@
+"""
+Command-line interface.
+
+Renders Portable Text documents from JSON or NDJSON files (or stdin) to HTML:
+
+    python -m portabletext_html document.json
+    python -m portabletext_html --workers 4 documents.ndjson > documents.html
+    python -m portabletext_html --profile slow-document.json
+    python -m portabletext_html --bench 100 documents.ndjson
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from portabletext_html.decoding import decode_json
+from portabletext_html.profiling import RenderProfile, percentile
+from portabletext_html.renderer import PortableTextRenderer, UnhandledNodeError
+
+if TYPE_CHECKING:
+    from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+    Document = Union[list, dict]
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the command-line renderer and return the exit status."""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        documents = list(_read_documents(args.paths, args.format))
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f'Could not read input: {e}\n')
+        return 2
+
+    try:
+        if args.bench:
+            _bench(documents, args.bench, args.coalesce_spans)
+        elif args.profile:
+            _profile(documents, args.coalesce_spans)
+        else:
+            _render(documents, args.workers, args.coalesce_spans)
+    except (UnhandledNodeError, ValueError) as e:
+        sys.stderr.write(f'Could not render document: {e}\n')
+        return 1
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='portabletext-html', description='Render Portable Text to HTML.')
+    parser.add_argument(
+        'paths', nargs='*', default=['-'], help='JSON or NDJSON files to render. Reads stdin when omitted or "-".'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['json', 'ndjson'],
+        help='Input format. Defaults to ndjson for .ndjson/.jsonl files and json otherwise.',
+    )
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes used to render documents.')
+    parser.add_argument('--coalesce-spans', action='store_true', help='Merge adjacent spans with equal marks.')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--profile', action='store_true', help='Print per-node-type render timings to stderr.')
+    mode.add_argument(
+        '--bench', type=int, metavar='N', help='Render every document N times and report latency and throughput.'
+    )
+    return parser
+
+
+def _read_documents(paths: List[str], input_format: Optional[str]) -> Iterator[Document]:
+    for path in paths:
+        if path == '-':
+            yield from _parse(getattr(sys.stdin, 'buffer', sys.stdin).read(), input_format or 'json')
+            continue
+        with open(path, 'rb') as f:
+            yield from _parse(f.read(), input_format or ('ndjson' if path.endswith(NDJSON_SUFFIXES) else 'json'))
+
+
+def _parse(data: Union[bytes, str], input_format: str) -> Iterator[Document]:
+    if input_format == 'json':
+        yield decode_json(data)
+        return
+    for line in data.splitlines():
+        if line.strip():
+            yield decode_json(line)
+
+
+def _render_document(document: Document, coalesce_spans: bool = False, profile: Optional[RenderProfile] = None) -> str:
+    return PortableTextRenderer(document, coalesce_spans=coalesce_spans, profile=profile).render()
+
+
+def _render(documents: List[Document], workers: int, coalesce_spans: bool) -> None:
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_render_document, documents, [coalesce_spans] * len(documents), chunksize=16)
+            for html in results:
+                sys.stdout.write(html + '\n')
+    else:
+        for document in documents:
+            sys.stdout.write(_render_document(document, coalesce_spans) + '\n')
+
+
+def _profile(documents: List[Document], coalesce_spans: bool) -> None:
+    profile = RenderProfile()
+    for document in documents:
+        sys.stdout.write(_render_document(document, coalesce_spans, profile) + '\n')
+    sys.stderr.write(profile.report() + '\n')
+
+
+def _bench(documents: List[Document], repeat: int, coalesce_spans: bool) -> None:
+    latencies, elapsed = _time_renders(documents, repeat, coalesce_spans)
+    sys.stdout.write(
+        f'documents: {len(documents)}, renders: {len(latencies)}\n'
+        f'p50: {percentile(latencies, 50) * 1000:.3f} ms\n'
+        f'p90: {percentile(latencies, 90) * 1000:.3f} ms\n'
+        f'p99: {percentile(latencies, 99) * 1000:.3f} ms\n'
+        f'max: {max(latencies) * 1000:.3f} ms\n'
+        f'throughput: {len(latencies) / elapsed:.1f} documents/s\n'
+    )
+
+
+def _time_renders(documents: List[Document], repeat: int, coalesce_spans: bool) -> Tuple[List[float], float]:
+    if repeat < 1 or not documents:
+        raise ValueError('--bench needs at least one document and one repetition')
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for document in documents:
+            start = time.perf_counter()
+            _render_document(document, coalesce_spans)
+            latencies.append(time.perf_counter() - start)
+    return latencies, time.perf_counter() - started
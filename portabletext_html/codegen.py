@@ -0,0 +1,210 @@
+"""
+Renderers specialized for a fixed configuration.
+
+When the custom marker definitions and serializers never change at runtime,
+`compile_renderer` generates a `PortableTextRenderer` subclass for them:
+
+    Renderer = compile_renderer(custom_marker_definitions={'link': RewritingLink(routes)})
+    html = Renderer(blocks).render()
+
+The generated span renderer resolves marker definitions by identity and has the
+tags of markers with static output inlined as string literals, instead of calling
+the marker methods for every span. Unmarked spans skip the sibling lookup
+altogether. The output is identical to the generic renderer.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from portabletext_html.cache import LRUCache
+from portabletext_html.constants import ANNOTATION_MARKER_DEFINITIONS, DECORATOR_MARKER_DEFINITIONS
+from portabletext_html.marker_definitions import (
+    CommentMarkerDefinition,
+    DefaultMarkerDefinition,
+    MarkerDefinition,
+    UnderlineMarkerDefinition,
+)
+from portabletext_html.renderer import PortableTextRenderer
+from portabletext_html.utils import escape_text
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+    from portabletext_html.types import Block
+
+    MarkerDefinitionLike = Union[Type[MarkerDefinition], MarkerDefinition]
+
+# Marker methods whose output only depends on the marker definition, not on the span or block
+_STATIC_METHODS = {
+    MarkerDefinition.render_prefix.__func__,  # type: ignore[attr-defined]
+    MarkerDefinition.render_suffix.__func__,  # type: ignore[attr-defined]
+    UnderlineMarkerDefinition.render_prefix.__func__,  # type: ignore[attr-defined]
+    CommentMarkerDefinition.render_prefix.__func__,  # type: ignore[attr-defined]
+    CommentMarkerDefinition.render_suffix.__func__,  # type: ignore[attr-defined]
+}
+_DEFAULT_RENDER_TEXT = MarkerDefinition.render_text.__func__  # type: ignore[attr-defined]
+
+_renderers = LRUCache(maxsize=64)
+
+_SPAN_TEMPLATE = '''
+def _render_span(self, span, block, escaped_text=None):
+    marks = span.marks
+    counters = self._counters
+    if not marks:
+        if escaped_text is None and counters is not None:
+            counters.escape_calls += 1
+        return escape_text(span.text) if escaped_text is None else escaped_text
+
+    prev_node, next_node = block.get_node_siblings(span)
+    prev_marks = prev_node.get('marks', []) if prev_node else []
+    next_marks = next_node.get('marks', []) if next_node else []
+    if len(marks) > 1 and not self._presorted_marks:
+        frequencies = block.marker_frequencies
+        marks = sorted(marks, key=lambda x: -frequencies[x])
+
+    definitions = block.marker_definitions
+    result = ''
+    text = None
+    suffixes = []
+    for mark in marks:
+        definition = definitions.get(mark, DefaultMarkerDefinition)
+        if mark not in prev_marks:
+{prefix}
+            if text is None:
+{text}
+        if mark not in next_marks:
+{suffix}
+
+    if counters is not None:
+        # Inlined tags count as marker calls too, so counters match the generic renderer
+        counters.marker_calls += (
+            sum(mark not in prev_marks for mark in marks)
+            + (text is not None)
+            + sum(mark not in next_marks for mark in marks)
+        )
+    if text is None:
+        text = escape_text(span.text) if escaped_text is None else escaped_text
+        if escaped_text is None and counters is not None:
+            counters.escape_calls += 1
+    suffixes.reverse()
+    return result + text + ''.join(suffixes)
+'''
+
+
+class SpecializedRendererMismatchError(AssertionError):
+    """Raised when a specialized renderer does not reproduce the output of the generic renderer."""
+
+    pass
+
+
+def compile_renderer(
+    custom_marker_definitions: Optional[Dict[str, MarkerDefinitionLike]] = None,
+    custom_serializers: Optional[Dict[str, Callable[[dict, Optional[Block], bool], str]]] = None,
+    samples: Iterable[Union[list, dict]] = (),
+) -> Type[PortableTextRenderer]:
+    """
+    Return a renderer class specialized for the given marker definitions and serializers.
+
+    Classes are cached per configuration, so calling this again with the same
+    definitions and serializers is cheap. The returned class takes the same
+    arguments as `PortableTextRenderer`, apart from the two fixed ones.
+
+    :param samples: Documents to verify the specialized renderer against the generic renderer with.
+    """
+    custom_marker_definitions = dict(custom_marker_definitions or {})
+    custom_serializers = dict(custom_serializers or {})
+    key = (
+        tuple(sorted((name, id(value)) for name, value in custom_marker_definitions.items())),
+        tuple(sorted((name, id(value)) for name, value in custom_serializers.items())),
+    )
+    renderer_class = _renderers.get(key)
+    if renderer_class is None:
+        # The class keeps the configuration alive, so the ids in the key are not reused while it is cached
+        renderer_class = _build_renderer(custom_marker_definitions, custom_serializers)
+        _renderers.set(key, renderer_class)
+
+    for index, sample in enumerate(samples):
+        expected = PortableTextRenderer(sample, custom_marker_definitions, custom_serializers).render()
+        if renderer_class(sample).render() != expected:
+            raise SpecializedRendererMismatchError(f'Specialized renderer output differs for sample {index}')
+    return renderer_class
+
+
+def _build_renderer(
+    custom_marker_definitions: Dict[str, MarkerDefinitionLike],
+    custom_serializers: Dict[str, Callable[[dict, Optional[Block], bool], str]],
+) -> Type[PortableTextRenderer]:
+    namespace: Dict[str, Any] = {'escape_text': escape_text, 'DefaultMarkerDefinition': DefaultMarkerDefinition}
+    prefix: List[Tuple[str, str]] = []
+    text: List[Tuple[str, str]] = []
+    suffix: List[Tuple[str, str]] = []
+
+    names: Dict[int, str] = {}
+    for definition in [
+        DefaultMarkerDefinition,
+        *DECORATOR_MARKER_DEFINITIONS.values(),
+        *ANNOTATION_MARKER_DEFINITIONS.values(),
+        *custom_marker_definitions.values(),
+    ]:
+        if id(definition) in names:
+            continue
+        name = names[id(definition)] = f'_definition_{len(names)}'
+        namespace[name] = definition
+
+        marker = definition() if isinstance(definition, type) else definition
+        static_prefix, static_suffix = _get_static_output(marker.render_prefix), _get_static_output(
+            marker.render_suffix
+        )
+        if static_prefix is not None:
+            prefix.append((name, f'result += {static_prefix!r}'))
+        if static_suffix is not None:
+            suffix.append((name, f'suffixes.append({static_suffix!r})'))
+        if getattr(marker.render_text, '__func__', None) is _DEFAULT_RENDER_TEXT:
+            text.append((name, 'text = str(span.text)'))
+
+    source = _SPAN_TEMPLATE.format(
+        prefix=_dispatch(prefix, 'result += self._get_marker(definition).render_prefix(span, mark, block)', 12),
+        text=_dispatch(text, 'text = self._get_marker(definition).render_text(span, mark, block)', 16),
+        suffix=_dispatch(suffix, 'suffixes.append(self._get_marker(definition).render_suffix(span, mark, block))', 12),
+    )
+    exec(compile(source, '<portabletext_html.codegen>', 'exec'), namespace)
+
+    def __init__(self: PortableTextRenderer, blocks: Any, **kwargs: Any) -> None:
+        PortableTextRenderer.__init__(self, blocks, custom_marker_definitions, custom_serializers, **kwargs)
+
+    return type(
+        'SpecializedPortableTextRenderer',
+        (PortableTextRenderer,),
+        {
+            '__init__': __init__,
+            '__doc__': 'HTML renderer specialized for a fixed set of marker definitions and serializers.',
+            '_render_span': namespace['_render_span'],
+            '_source': source,
+        },
+    )
+
+
+def _get_static_output(method: Any) -> Optional[str]:
+    """Return the output of a marker method that does not depend on its arguments, or None for other methods."""
+    if getattr(method, '__func__', None) not in _STATIC_METHODS:
+        return None
+    return method(None, '', None)
+
+
+def _dispatch(cases: List[Tuple[str, str]], fallback: str, indent: int) -> str:
+    """Return an if/elif chain running the inlined code for known definitions, and fallback otherwise."""
+    grouped: Dict[str, List[str]] = {}
+    for name, statement in cases:
+        grouped.setdefault(statement, []).append(name)
+
+    lines = []
+    for index, (statement, names) in enumerate(grouped.items()):
+        condition = ' or '.join(f'definition is {name}' for name in names)
+        lines.append(f'{"if" if index == 0 else "elif"} {condition}:')
+        lines.append(f'    {statement}')
+    if lines:
+        lines.append('else:')
+        lines.append(f'    {fallback}')
+    else:
+        lines.append(fallback)
+    return '\n'.join(' ' * indent + line for line in lines)
@@ -0,0 +1,98 @@
+"""
+Persistable compiled documents.
+
+A compiled document holds the prepared form of a document, so a restarted
+process can go straight to emitting HTML:
+
+    compiled = PortableTextRenderer(blocks, **options).compile()
+    compiled.save('document.pthc')
+    ...
+    html = PortableTextRenderer(CompiledDocument.load('document.pthc'), **options).render()
+
+The file format is a short header line followed by a compact JSON payload, read
+back with a single bulk read.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from portabletext_html.decoding import decode_json
+
+if TYPE_CHECKING:
+    from typing import List, Optional, Tuple, Union
+
+MAGIC = b'PTHTML-COMPILED'
+FORMAT_VERSION = 1
+
+
+class IncompatibleCompiledDocumentError(ValueError):
+    """Raised when a compiled document does not match the library version or renderer configuration."""
+
+    pass
+
+
+def get_library_version() -> str:
+    """Return the installed version of this package."""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # pragma: no cover - Python 3.7
+        return 'unknown'
+    try:
+        return version('portabletext-html')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+@dataclass(frozen=True)
+class CompiledDocument:
+    """A prepared document, as returned by `PortableTextRenderer.compile`."""
+
+    nodes: List[Tuple[dict, Optional[dict], bool]]
+    wrapper_element: Optional[str]
+    config: str
+    library_version: str = field(default_factory=get_library_version)
+    format_version: int = FORMAT_VERSION
+
+    def dumps(self) -> bytes:
+        """Serialize the compiled document."""
+        header = {'format': self.format_version, 'library': self.library_version, 'config': self.config}
+        payload = {'wrapper': self.wrapper_element, 'nodes': self.nodes}
+        return b'\n'.join([MAGIC, _dumps(header), _dumps(payload)])
+
+    @classmethod
+    def loads(cls, data: bytes) -> CompiledDocument:
+        """Deserialize a compiled document, checking that it was written by a compatible version."""
+        magic, header_line, payload = data.split(b'\n', 2)
+        if magic != MAGIC:
+            raise IncompatibleCompiledDocumentError('Not a compiled Portable Text document')
+
+        header = decode_json(header_line)
+        if header['format'] != FORMAT_VERSION or header['library'] != get_library_version():
+            raise IncompatibleCompiledDocumentError(
+                f'Document was compiled with format {header["format"]} by version {header["library"]}'
+            )
+
+        content = decode_json(payload)
+        return cls(
+            nodes=[(node, context, list_item) for node, context, list_item in content['nodes']],
+            wrapper_element=content['wrapper'],
+            config=header['config'],
+            library_version=header['library'],
+            format_version=header['format'],
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the compiled document to a file."""
+        Path(path).write_bytes(self.dumps())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> CompiledDocument:
+        """Read a compiled document from a file."""
+        return cls.loads(Path(path).read_bytes())
+
+
+def _dumps(obj: object) -> bytes:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
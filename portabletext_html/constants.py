@@ -28,6 +28,8 @@ STYLE_MAP = {
     'normal': 'p',
 }
 
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
 DECORATOR_MARKER_DEFINITIONS: Dict[str, Type[MarkerDefinition]] = {
     'em': EmphasisMarkerDefinition,
     'strong': StrongMarkerDefinition,
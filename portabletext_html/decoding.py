@@ -0,0 +1,46 @@
+"""
+JSON decoding.
+
+The fastest available decoder is used: `orjson` or `msgspec` when installed,
+and the standard library `json` module otherwise.
+"""
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Union
+
+
+@lru_cache(maxsize=None)
+def get_decoder() -> Callable[[Union[bytes, str]], Any]:
+    """Return the fastest JSON decoder available."""
+    try:
+        import orjson
+
+        return orjson.loads
+    except ImportError:
+        pass
+
+    try:
+        import msgspec
+    except ImportError:
+        pass
+    else:
+
+        def decode(data: Union[bytes, str]) -> Any:
+            try:
+                return msgspec.json.decode(data)
+            except msgspec.DecodeError as e:  # not a ValueError, unlike the other decoders
+                raise ValueError(str(e)) from e
+
+        return decode
+
+    return json.loads
+
+
+def decode_json(data: Union[bytes, str]) -> Any:
+    """Decode JSON bytes or text."""
+    return get_decoder()(data)
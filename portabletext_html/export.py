@@ -0,0 +1,242 @@
+"""
+Resumable bulk export to static HTML.
+
+Reads documents from an NDJSON file, e.g. a dataset export, renders the Portable
+Text field of each document and writes one HTML file per document:
+
+    python -m portabletext_html.export documents.ndjson out/ --shard 0 --shards 4
+
+Documents are assigned to shards by a hash of their ID, so several processes or
+machines can each export their own shard of the same source. Every shard keeps a
+manifest with a content hash per exported document. It is written after each
+batch, so a rerun skips documents that are unchanged and resumes an interrupted
+export where it stopped.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+from portabletext_html.cache import fingerprint
+from portabletext_html.compiled import get_library_version
+from portabletext_html.decoding import decode_json
+from portabletext_html.renderer import PortableTextRenderer
+from portabletext_html.streaming import COMPRESSIONS
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+MANIFEST_VERSION = 1
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'brotli': '.br'}
+
+
+@dataclass
+class ExportResult:
+    """Counts of an export run, and the render errors by document ID."""
+
+    rendered: int = 0
+    skipped: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def get_shard(document_id: str, shards: int) -> int:
+    """Return the shard a document belongs to. Stable across processes, machines and Python versions."""
+    return int(hashlib.sha1(document_id.encode()).hexdigest(), 16) % shards
+
+
+def get_output_name(document_id: str, compression: Optional[str] = None) -> str:
+    """Return the file name of the exported HTML for a document ID."""
+    return quote(document_id, safe='') + '.html' + COMPRESSION_SUFFIXES.get(compression or '', '')
+
+
+def export(
+    source: Union[str, Path],
+    output_dir: Union[str, Path],
+    shard: int = 0,
+    shards: int = 1,
+    batch_size: int = 100,
+    workers: int = 1,
+    id_field: str = '_id',
+    content_field: str = 'body',
+    compression: Optional[str] = None,
+    **renderer_options: Any,
+) -> ExportResult:
+    """
+    Export the documents of one shard of an NDJSON source to HTML files in output_dir.
+
+    Documents are skipped when the manifest holds the same content hash for them
+    and their HTML file exists. The hash covers the Portable Text content, the
+    renderer configuration and the library version. Documents that fail to render
+    are reported in the result and retried on the next run.
+
+    :param shard: Index of the shard to export, from 0 up to shards.
+    :param shards: Total number of shards the source is split into.
+    :param batch_size: Number of documents rendered between manifest updates.
+    :param workers: Number of processes used to render each batch.
+    :param id_field: Document field holding the document ID.
+    :param content_field: Document field holding the Portable Text to render.
+    :param compression: Write 'gzip' or 'brotli' compressed files instead of plain HTML.
+    :param renderer_options: Keyword arguments passed on to `PortableTextRenderer`.
+    """
+    if not 0 <= shard < shards:
+        raise ValueError(f'shard must be between 0 and {shards - 1}')
+    if batch_size < 1:
+        raise ValueError('batch_size must be at least 1')
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f'Unknown compression: {compression}')
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / f'manifest-{shard}-of-{shards}.json'
+    manifest = _load_manifest(manifest_path)
+    config = fingerprint(
+        [get_library_version(), PortableTextRenderer([], **renderer_options)._stable_config_fingerprint()]
+    )
+
+    result = ExportResult()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        batch: List[Tuple[str, str, Any]] = []
+        for document_id, content in _read_shard(Path(source), shard, shards, id_field, content_field):
+            content_hash = fingerprint([config, content])
+            entry = manifest.get(document_id)
+            name = get_output_name(document_id, compression)
+            if entry and entry['hash'] == content_hash and entry['file'] == name and (output_dir / name).exists():
+                result.skipped += 1
+                continue
+            batch.append((document_id, content_hash, content))
+            if len(batch) == batch_size:
+                _export_batch(
+                    batch, output_dir, manifest, manifest_path, renderer_options, compression, executor, result
+                )
+                batch = []
+        if batch:
+            _export_batch(batch, output_dir, manifest, manifest_path, renderer_options, compression, executor, result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return result
+
+
+def _read_shard(source: Path, shard: int, shards: int, id_field: str, content_field: str) -> Iterator[Tuple[str, Any]]:
+    with source.open('rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            document = decode_json(line)
+            document_id = document.get(id_field)
+            if document_id is None or content_field not in document:
+                continue
+            if get_shard(str(document_id), shards) == shard:
+                yield str(document_id), document[content_field]
+
+
+def _render_content(
+    content: Any, renderer_options: Dict[str, Any], compression: Optional[str]
+) -> Tuple[Optional[bytes], Optional[str]]:
+    """Render one document to encoded and optionally compressed HTML, returning (data, None) or (None, error)."""
+    output = io.BytesIO()
+    try:
+        PortableTextRenderer(content, **renderer_options).render_to(output, compression)
+    except Exception as e:
+        # Any error may be caused by the document, e.g. a KeyError for a span without text,
+        # so one broken document must not stop the export of the others
+        return None, f'{type(e).__name__}: {e}'
+    return output.getvalue(), None
+
+
+def _export_batch(
+    batch: List[Tuple[str, str, Any]],
+    output_dir: Path,
+    manifest: Dict[str, Dict[str, str]],
+    manifest_path: Path,
+    renderer_options: Dict[str, Any],
+    compression: Optional[str],
+    executor: Optional[ProcessPoolExecutor],
+    result: ExportResult,
+) -> None:
+    contents = [content for _, _, content in batch]
+    if executor is not None:
+        options = [renderer_options] * len(contents)
+        rendered = list(executor.map(_render_content, contents, options, [compression] * len(contents)))
+    else:
+        rendered = [_render_content(content, renderer_options, compression) for content in contents]
+
+    for (document_id, content_hash, _), (data, error) in zip(batch, rendered):
+        if data is None:
+            result.failed[document_id] = error or ''
+            manifest.pop(document_id, None)
+            continue
+        name = get_output_name(document_id, compression)
+        _write_atomic(output_dir / name, data)
+        manifest[document_id] = {'hash': content_hash, 'file': name}
+        result.rendered += 1
+
+    _write_atomic(manifest_path, json.dumps({'version': MANIFEST_VERSION, 'documents': manifest}).encode())
+
+
+def _load_manifest(path: Path) -> Dict[str, Dict[str, str]]:
+    if not path.exists():
+        return {}
+    data = decode_json(path.read_bytes())
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data['documents']
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so readers, and reruns after a crash, never see it half written."""
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run an export from the command line and return the exit status."""
+    parser = argparse.ArgumentParser(
+        prog='python -m portabletext_html.export', description='Export Portable Text documents to HTML files.'
+    )
+    parser.add_argument('source', help='NDJSON file with one document per line.')
+    parser.add_argument('output_dir', help='Directory to write HTML files and the manifest to.')
+    parser.add_argument('--shard', type=int, default=0, help='Index of the shard to export.')
+    parser.add_argument('--shards', type=int, default=1, help='Number of shards the source is split into.')
+    parser.add_argument('--batch-size', type=int, default=100, help='Documents rendered per checkpoint.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes used to render documents.')
+    parser.add_argument('--id-field', default='_id', help='Document field holding the document ID.')
+    parser.add_argument('--content-field', default='body', help='Document field holding the Portable Text.')
+    parser.add_argument('--compression', choices=COMPRESSIONS, help='Write compressed HTML files.')
+    args = parser.parse_args(argv)
+
+    try:
+        result = export(
+            args.source,
+            args.output_dir,
+            shard=args.shard,
+            shards=args.shards,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            id_field=args.id_field,
+            content_field=args.content_field,
+            compression=args.compression,
+        )
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f'Could not export documents: {e}\n')
+        return 2
+
+    for document_id, error in sorted(result.failed.items()):
+        sys.stderr.write(f'Could not render {document_id}: {error}\n')
+    sys.stdout.write(f'rendered: {result.rendered}, skipped: {result.skipped}, failed: {len(result.failed)}\n')
+    return 1 if result.failed else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
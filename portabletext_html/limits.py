@@ -0,0 +1,108 @@
+"""Resource limits for rendering untrusted documents."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from portabletext_html.utils import is_list
+
+if TYPE_CHECKING:
+    from typing import Iterable, Iterator, Optional, Tuple
+
+
+class RenderLimitExceededError(Exception):
+    """Raised when a document exceeds one of the configured render limits."""
+
+    def __init__(self, limit: str, message: str) -> None:
+        super().__init__(message)
+        self.limit = limit
+
+    def __reduce__(self) -> Tuple[type, Tuple[str, str]]:
+        # Keep the error picklable, so it can be raised from worker processes
+        return type(self), (self.limit, str(self))
+
+
+@dataclass(frozen=True)
+class RenderLimits:
+    """
+    Limits guarding against pathological documents.
+
+    Every limit is optional. Structural limits are checked before any rendering
+    starts, so documents that exceed them fail fast. The time budget is given in
+    seconds, and the output length in characters.
+    """
+
+    max_list_depth: Optional[int] = None
+    max_spans_per_block: Optional[int] = None
+    max_mark_defs_per_block: Optional[int] = None
+    max_nodes: Optional[int] = None
+    max_output_length: Optional[int] = None
+    time_budget: Optional[float] = None
+
+    def check_document(self, blocks: list[dict]) -> None:
+        """Check the structural limits for a list of top-level blocks."""
+        nodes = 0
+        for block in blocks:
+            children = block.get('children') or []
+            mark_defs = block.get('markDefs') or []
+            nodes += 1 + len(children)
+
+            if self.max_spans_per_block is not None and len(children) > self.max_spans_per_block:
+                raise RenderLimitExceededError(
+                    'max_spans_per_block', f'Block has {len(children)} children, limit is {self.max_spans_per_block}'
+                )
+            if self.max_mark_defs_per_block is not None and len(mark_defs) > self.max_mark_defs_per_block:
+                raise RenderLimitExceededError(
+                    'max_mark_defs_per_block',
+                    f'Block has {len(mark_defs)} mark definitions, limit is {self.max_mark_defs_per_block}',
+                )
+            if self.max_list_depth is not None and is_list(block):
+                level = block.get('level') or 1
+                if not isinstance(level, int) or level > self.max_list_depth:
+                    raise RenderLimitExceededError(
+                        'max_list_depth', f'List item has level {level}, limit is {self.max_list_depth}'
+                    )
+            if self.max_nodes is not None and nodes > self.max_nodes:
+                raise RenderLimitExceededError('max_nodes', f'Document has more than {self.max_nodes} nodes')
+
+    def check_compiled(self, nodes: Iterable[Tuple[dict, Optional[dict], bool]]) -> None:
+        """Check the structural limits for the top-level nodes of a compiled document."""
+        self.check_document([block for node, _, _ in nodes for block in _flatten_lists(node)])
+
+    def get_deadline(self) -> Optional[float]:
+        """Return the monotonic clock time at which the time budget runs out."""
+        return time.monotonic() + self.time_budget if self.time_budget is not None else None
+
+    def limit_output(self, fragments: Iterable[str], deadline: Optional[float]) -> Iterator[str]:
+        """Pass through rendered fragments, enforcing the output length and the time budget."""
+        length = 0
+        for fragment in fragments:
+            length += len(fragment)
+            if self.max_output_length is not None and length > self.max_output_length:
+                raise RenderLimitExceededError(
+                    'max_output_length', f'Output exceeds {self.max_output_length} characters'
+                )
+            check_deadline(deadline)
+            yield fragment
+
+
+def check_deadline(deadline: Optional[float]) -> None:
+    """Raise if the time budget of the current render has run out."""
+    if deadline is not None and time.monotonic() > deadline:
+        raise RenderLimitExceededError('time_budget', 'Rendering exceeded its time budget')
+
+
+def _flatten_lists(node: dict) -> Iterator[dict]:
+    """Yield the blocks of a normalized list tree as list item blocks, like those it was built from."""
+    if node.get('_type') != 'list':
+        yield node
+        return
+    for item in node.get('children') or []:
+        children = item.get('children') or []
+        nested = [child for child in children if child.get('_type') == 'list']
+        if nested:
+            item = {**item, 'children': [child for child in children if child.get('_type') != 'list']}
+        yield item
+        for child in nested:
+            yield from _flatten_lists(child)
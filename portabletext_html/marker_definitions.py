@@ -106,7 +106,7 @@ class LinkMarkerDefinition(MarkerDefinition):
         The href attribute is fetched from the provided block context using
         the provided marker key.
         """
-        marker_definition = next((md for md in context.markDefs if md['_key'] == marker), None)
+        marker_definition = context.get_mark_definition(marker)
         if not marker_definition:
             raise ValueError(f'Marker definition for key: {marker} not found in parent block context')
         href = marker_definition.get('href', '')
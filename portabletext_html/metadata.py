@@ -0,0 +1,76 @@
+"""Document metadata collected while rendering."""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from portabletext_html.utils import slugify
+
+if TYPE_CHECKING:
+    from typing import List, Set
+
+    from portabletext_html.types import Block
+
+WORDS_PER_MINUTE = 200
+
+
+@dataclass
+class Heading:
+    """A heading in the rendered document, e.g. for building a table of contents."""
+
+    level: int
+    text: str
+    anchor: str
+
+
+@dataclass
+class DocumentMetadata:
+    """Metadata gathered during a single traversal of a document."""
+
+    headings: List[Heading] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    word_count: int = 0
+    _anchors: Set[str] = field(default_factory=set, repr=False)
+    _hrefs: Set[str] = field(default_factory=set, repr=False)  # the links, for constant time lookups
+
+    @property
+    def reading_time(self) -> int:
+        """Return the estimated reading time in whole minutes."""
+        return math.ceil(self.word_count / WORDS_PER_MINUTE)
+
+    def add_block(self, block: Block) -> None:
+        """Collect the words and link hrefs of a block."""
+        self.word_count += len(get_block_text(block).split())
+        for definition in block.markDefs:
+            href = definition.get('href')
+            if definition.get('_type') == 'link' and href and href not in self._hrefs:
+                self._hrefs.add(href)
+                self.links.append(href)
+
+    def add_heading(self, block: Block, tag: str) -> str:
+        """Register a heading and return its anchor ID, which is unique within the document."""
+        text = get_block_text(block).strip()
+        anchor = base = slugify(text)
+        suffix = 1
+        while anchor in self._anchors:
+            suffix += 1
+            anchor = f'{base}-{suffix}'
+        self._anchors.add(anchor)
+        self.headings.append(Heading(level=int(tag[1]), text=text, anchor=anchor))
+        return anchor
+
+
+@dataclass
+class RenderResult:
+    """Rendered HTML together with the metadata collected while rendering it."""
+
+    html: str
+    metadata: DocumentMetadata
+
+
+def get_block_text(block: Block) -> str:
+    """Return the plain text of the spans in a block."""
+    return ''.join(
+        child['text'] for child in block.children if child.get('_type') == 'span' and isinstance(child.get('text'), str)
+    )
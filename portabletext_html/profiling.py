@@ -0,0 +1,92 @@
+"""Render profiling helpers."""
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Sequence
+
+
+@dataclass
+class NodeTiming:
+    """Accumulated render time for one node type."""
+
+    count: int = 0
+    total: float = 0.0  # including time spent rendering nested nodes
+    own: float = 0.0  # excluding time spent rendering nested nodes
+
+
+class RenderProfile:
+    """
+    Collect per-node-type render timings.
+
+    Pass an instance to `PortableTextRenderer(profile=...)`. The same profile
+    can be reused for several renders to aggregate their timings.
+    """
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, NodeTiming] = {}
+        self._stack: List[List[float]] = []  # [start, time spent in nested nodes]
+
+    def enter(self) -> None:
+        """Mark the start of a node render."""
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def exit(self, node_type: str) -> None:
+        """Mark the end of the most recently entered node render."""
+        start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+        timing = self.timings.setdefault(node_type, NodeTiming())
+        timing.count += 1
+        timing.total += elapsed
+        timing.own += elapsed - nested
+
+    def report(self) -> str:
+        """Return a table of the collected timings, most expensive node types first."""
+        lines = [f'{"node type":<20} {"count":>8} {"total ms":>10} {"own ms":>10} {"own us/node":>12}']
+        for node_type, timing in sorted(self.timings.items(), key=lambda item: -item[1].own):
+            lines.append(
+                f'{node_type:<20} {timing.count:>8} {timing.total * 1000:>10.3f} {timing.own * 1000:>10.3f} '
+                f'{timing.own * 1e6 / timing.count:>12.2f}'
+            )
+        return '\n'.join(lines)
+
+
+@dataclass
+class RenderCounters:
+    """
+    Count the structural work done while rendering.
+
+    Pass an instance to `PortableTextRenderer(counters=...)`. Unlike timings, the
+    counts are deterministic, so tests can assert that the work grows linearly
+    with the size of the input.
+    """
+
+    blocks: int = 0  # Block constructions
+    spans: int = 0  # Span constructions
+    sibling_lookups: int = 0
+    sibling_scan_steps: int = 0  # children visited to find siblings
+    mark_def_lookups: int = 0
+    mark_def_scan_steps: int = 0  # markDefs entries visited to find mark definitions
+    marker_calls: int = 0  # render_prefix, render_text and render_suffix calls
+    escape_calls: int = 0
+    output_chars: int = 0  # characters of rendered nodes concatenated into their parents
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters by name."""
+        return asdict(self)
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Return the nearest-rank percentile of values."""
+    if not values:
+        raise ValueError('Cannot compute a percentile of no values')
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * percent / 100))
+    return ordered[rank - 1]
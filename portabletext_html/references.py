@@ -0,0 +1,59 @@
+"""
+Bulk resolution of references.
+
+Annotations and custom types often point at other documents through `_ref`
+values. Instead of resolving those one at a time while rendering, collect them
+from one or many documents up front and resolve them in a single call:
+
+    references = resolve_references(documents, fetch_documents_by_id)
+    for document in documents:
+        html = PortableTextRenderer(document, references=references).render()
+
+Marker definitions and serializers then find the resolved values through
+`context.references`.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Iterable, List, Mapping, Set, Union
+
+    Document = Union[list, dict]
+
+
+def collect_reference_ids(documents: Iterable[Document]) -> Set[str]:
+    """Return every `_ref` value found in the given documents, including those in `markDefs` and custom nodes."""
+    ids: Set[str] = set()
+    stack: List[Any] = list(documents)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            ref = value.get('_ref')
+            if isinstance(ref, str):
+                ids.add(ref)
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return ids
+
+
+def resolve_references(
+    documents: Iterable[Document], resolver: Callable[[List[str]], Mapping[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Resolve all references in the given documents with a single call to resolver.
+
+    The resolver receives the sorted list of referenced IDs and returns a mapping
+    from ID to the resolved value. IDs it leaves out are treated as unresolved.
+    The resolver is not called when the documents contain no references.
+    """
+    ids = collect_reference_ids(documents)
+    if not ids:
+        return {}
+    return dict(resolver(sorted(ids)))
+
+
+def get_referenced(node: dict, references: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return the resolved values of the references in node, e.g. for use in cache keys."""
+    return {ref: references.get(ref) for ref in sorted(collect_reference_ids([node]))}
@@ -1,18 +1,52 @@
 from __future__ import annotations
 
-import html
+import math
+import os
 from typing import TYPE_CHECKING, cast
 
-from portabletext_html.constants import STYLE_MAP
+from portabletext_html.constants import HEADING_TAGS, STYLE_MAP
+from portabletext_html.limits import check_deadline
 from portabletext_html.logger import logger
 from portabletext_html.marker_definitions import DefaultMarkerDefinition
 from portabletext_html.types import Block, Span
-from portabletext_html.utils import get_list_tags, is_block, is_list, is_span
+from portabletext_html.utils import (
+    coalesce_spans,
+    escape_span_texts,
+    escape_text,
+    get_list_tags,
+    get_marker_frequencies,
+    get_node_type,
+    is_block,
+    is_list,
+    is_span,
+)
 
 if TYPE_CHECKING:
-    from typing import Any, Callable, Dict, List, Optional, Type, Union
-
+    from typing import (
+        Any,
+        BinaryIO,
+        Callable,
+        Dict,
+        Hashable,
+        Iterable,
+        Iterator,
+        List,
+        Literal,
+        Mapping,
+        Optional,
+        Tuple,
+        Type,
+        Union,
+    )
+
+    from portabletext_html.cache import FragmentCache, SerializerCache
+    from portabletext_html.compiled import CompiledDocument
+    from portabletext_html.limits import RenderLimits
     from portabletext_html.marker_definitions import MarkerDefinition
+    from portabletext_html.metadata import DocumentMetadata, RenderResult
+    from portabletext_html.profiling import RenderCounters, RenderProfile
+
+    TopLevelNode = Tuple[dict, Optional[dict], bool]
 
 
 class UnhandledNodeError(Exception):
@@ -37,53 +71,383 @@ class PortableTextRenderer:
 
     def __init__(
         self,
-        blocks: Union[list[dict], dict],
-        custom_marker_definitions: dict[str, Type[MarkerDefinition]] | None = None,
+        blocks: Union[list[dict], dict, CompiledDocument],
+        custom_marker_definitions: dict[str, Union[Type[MarkerDefinition], MarkerDefinition]] | None = None,
         custom_serializers: dict[str, Callable[[dict, Optional[Block], bool], str]] | None = None,
+        coalesce_spans: bool = False,
+        serializer_cache: SerializerCache | None = None,
+        escape_strategy: Literal['batched', 'per_span'] = 'batched',
+        profile: RenderProfile | None = None,
+        fragment_cache: FragmentCache | None = None,
+        limits: RenderLimits | None = None,
+        references: Mapping[str, Any] | None = None,
+        counters: RenderCounters | None = None,
     ) -> None:
         logger.debug('Initializing block renderer')
         self._wrapper_element: Optional[str] = None
         self._custom_marker_definitions = custom_marker_definitions or {}
         self._custom_serializers = custom_serializers or {}
+        self._markers: Dict[Type[MarkerDefinition], MarkerDefinition] = {}
+        self._coalesce_spans = coalesce_spans
+        self._serializer_cache = serializer_cache
+        if escape_strategy not in ('batched', 'per_span'):
+            raise ValueError(f'Unknown escape strategy: {escape_strategy}')
+        self._escape_strategy = escape_strategy
+        self._batch_escaping = escape_strategy == 'batched'
+        self._profile = profile
+        self._counters = counters
+        self._fragment_cache = fragment_cache
+        self._config_key: Optional[Hashable] = None
+        self._metadata: Optional[DocumentMetadata] = None
+        self._limits = limits
+        self._deadline: Optional[float] = None
+        self._references = references or {}
+
+        self._compiled_nodes: Optional[List[TopLevelNode]] = None
+        self._presorted_marks = False  # compiled documents store span marks in render order
+        self._list_ordinals: Optional[List[int]] = None
+        self._list_starts: Dict[str, int] = {}
 
         if isinstance(blocks, dict):
             self._blocks = [blocks]
         elif isinstance(blocks, list):
             self._blocks = blocks
             self._wrapper_element = 'div' if len(blocks) > 1 else ''
+        else:
+            self._load_compiled(blocks)
+
+    def _load_compiled(self, compiled: CompiledDocument) -> None:
+        from portabletext_html.compiled import CompiledDocument, IncompatibleCompiledDocumentError
+
+        if not isinstance(compiled, CompiledDocument):
+            raise TypeError(f'Expected blocks as a list, dict or CompiledDocument, received {type(compiled)}')
+        if compiled.config != self._stable_config_fingerprint():
+            raise IncompatibleCompiledDocumentError('Document was compiled with a different renderer configuration')
+        self._blocks = []
+        self._compiled_nodes = compiled.nodes
+        self._presorted_marks = True
+        self._wrapper_element = compiled.wrapper_element
 
     def render(self) -> str:
         """Render HTML from self._blocks."""
         logger.debug('Rendering HTML')
 
-        if not self._blocks:
+        if not self._blocks and not self._compiled_nodes:
+            return ''
+
+        return self._wrap(''.join(self._render_fragments()))
+
+    def iter_render(self) -> Iterator[str]:
+        """
+        Render HTML from self._blocks in chunks, as each top-level block or list is rendered.
+
+        Joined, the chunks are equal to the output of `render`.
+        """
+        from portabletext_html.streaming import strip_chunks
+
+        if not self._blocks and not self._compiled_nodes:
+            return
+
+        if self._wrapper_element:
+            yield f'<{self._wrapper_element}>'
+        yield from strip_chunks(self._render_fragments())
+        if self._wrapper_element:
+            yield f'</{self._wrapper_element}>'
+
+    def render_to(self, target: BinaryIO, compression: Optional[str] = None, encoding: str = 'utf-8') -> int:
+        """
+        Render HTML into a binary file-like target, optionally compressed with 'gzip' or 'brotli'.
+
+        Chunks are encoded and compressed as they are rendered, without building the
+        full output in memory. Returns the number of uncompressed bytes written.
+        """
+        from portabletext_html.streaming import write_chunks
+
+        return write_chunks(self.iter_render(), target, compression, encoding)
+
+    def _render_fragments(self) -> Iterable[str]:
+        fragments: Iterable[str] = (
+            self._render_top_level_node(node, context, list_item)
+            for node, context, list_item in self._top_level_nodes()
+        )
+        if self._limits is not None:
+            self._check_document_limits(self._limits)
+            fragments = self._limits.limit_output(fragments, self._deadline)
+        return fragments
+
+    def _check_document_limits(self, limits: RenderLimits) -> None:
+        """Check the structural limits for the whole document and start the time budget."""
+        if self._compiled_nodes is not None:
+            limits.check_compiled(self._compiled_nodes)
+        else:
+            limits.check_document(self._blocks)
+        self._deadline = limits.get_deadline()
+
+    def render_parallel(
+        self, max_workers: Optional[int] = None, use_processes: bool = False, partition_size: Optional[int] = None
+    ) -> str:
+        """
+        Render HTML from self._blocks, spreading the work over a thread or process pool.
+
+        The top-level nodes are split into contiguous partitions at the same boundaries
+        as in `render`, so list groups are never split, and the rendered partitions are
+        joined in order. The output is identical to `render`.
+
+        Threads give a speedup on free-threaded Python builds; otherwise use processes,
+        which requires custom marker definitions and serializers to be picklable.
+        Caches, profiling and metadata collection are not shared with worker processes.
+
+        :param max_workers: Size of the pool. Defaults to the executor default.
+        :param use_processes: Use a process pool instead of a thread pool.
+        :param partition_size: Number of top-level nodes per partition.
+        """
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+        logger.debug('Rendering HTML in parallel')
+        if self._profile is not None or self._counters is not None or self._metadata is not None:
+            raise ValueError('Profiling, counting and metadata collection are not supported when rendering in parallel')
+
+        if not self._blocks and not self._compiled_nodes:
+            return ''
+
+        if self._limits is not None:
+            self._check_document_limits(self._limits)
+
+        nodes = list(self._top_level_nodes())
+        workers = max_workers or os.cpu_count() or 1
+        size = partition_size or max(1, math.ceil(len(nodes) / (workers * 4)))
+        partitions = [nodes[i : i + size] for i in range(0, len(nodes), size)]  # noqa: E203
+
+        executor: Union[ProcessPoolExecutor, ThreadPoolExecutor]
+        executor = ProcessPoolExecutor(max_workers) if use_processes else ThreadPoolExecutor(max_workers)
+        with executor:
+            if use_processes:
+                options = self._portable_options()
+                futures = [executor.submit(_render_partition, options, self._deadline, part) for part in partitions]
+            else:
+                futures = [executor.submit(self._render_partition, part) for part in partitions]
+
+            try:
+                if self._limits is not None:
+                    # Check the output length and time budget as partitions finish, rather than after all of them
+                    for _ in self._limits.limit_output((f.result() for f in as_completed(futures)), self._deadline):
+                        pass
+                fragments = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        return self._wrap(''.join(fragments))
+
+    def _render_partition(self, nodes: List[TopLevelNode]) -> str:
+        return ''.join(self._render_top_level_node(node, context, list_item) for node, context, list_item in nodes)
+
+    def _portable_options(self) -> dict:
+        """Return the constructor arguments that affect output, for recreating the renderer elsewhere."""
+        return {
+            'custom_marker_definitions': self._custom_marker_definitions,
+            'custom_serializers': self._custom_serializers,
+            'coalesce_spans': self._coalesce_spans,
+            'escape_strategy': self._escape_strategy,
+            'references': self._references,
+        }
+
+    def _wrap(self, result: str) -> str:
+        result = result.strip()
+
+        if self._wrapper_element:
+            return f'<{self._wrapper_element}>{result}</{self._wrapper_element}>'
+        return result
+
+    def render_range(self, start: int, stop: int) -> str:
+        """
+        Render the top-level blocks from index start up to, but not including, stop.
+
+        Lists that continue from before the range keep their numbering, e.g. through
+        `<ol start="4">`. The result is not wrapped in a containing element, and the
+        cost is proportional to the size of the range.
+        """
+        if self._compiled_nodes is not None:
+            raise ValueError('Rendering a range is not supported for compiled documents')
+
+        window = self._blocks[start:stop]
+        if not window:
             return ''
+        if self._limits is not None:
+            self._limits.check_document(window)
+            self._deadline = self._limits.get_deadline()
+
+        ordinals = self._get_list_ordinals()
+        offset = range(len(self._blocks))[start:stop].start
+        self._list_starts = {
+            f'${node["_key"]}-parent': ordinals[offset + index]
+            for index, node in enumerate(window)
+            if ordinals[offset + index] > 1 and '_key' in node
+        }
+        try:
+            fragments: Iterable[str] = (
+                self._render_top_level_node(node, context, list_item)
+                for node, context, list_item in self._iter_top_level_nodes(window)
+            )
+            if self._limits is not None:
+                fragments = self._limits.limit_output(fragments, self._deadline)
+            return ''.join(fragments).strip()
+        finally:
+            self._list_starts = {}
+
+    def iter_pages(self, page_size: int) -> Iterator[str]:
+        """Render the document in pages of page_size top-level blocks, using `render_range`."""
+        if self._compiled_nodes is not None:
+            raise ValueError('Rendering pages is not supported for compiled documents')
+        if page_size < 1:
+            raise ValueError('page_size must be at least 1')
+        for start in range(0, len(self._blocks), page_size):
+            yield self.render_range(start, start + page_size)
+
+    def _get_list_ordinals(self) -> List[int]:
+        """
+        Return the position of each top-level block within its list, or 0 for non-list blocks.
+
+        Positions are taken from the normalized list trees, so they follow the same grouping
+        as `render`. Computed once per renderer.
+        """
+        if self._list_ordinals is None:
+            ordinals: List[int] = []
+            for node, _, list_item in self._iter_top_level_nodes(self._blocks):
+                if list_item and node.get('_type') == 'list':
+                    ordinals.extend(_iter_item_positions(node))
+                else:
+                    ordinals.append(0)
+            self._list_ordinals = ordinals
+        return self._list_ordinals
+
+    def render_with_metadata(self) -> RenderResult:
+        """
+        Render HTML and collect document metadata in the same traversal.
+
+        Collects headings for a table of contents, link hrefs and the word count.
+        Headings are rendered with an id attribute matching their anchor.
+        """
+        from portabletext_html.metadata import DocumentMetadata, RenderResult
+
+        self._metadata = DocumentMetadata()
+        try:
+            return RenderResult(html=self.render(), metadata=self._metadata)
+        finally:
+            self._metadata = None
+
+    def _iter_top_level_nodes(self, blocks: list[dict]) -> Iterator[TopLevelNode]:
+        """
+        Yield (node, context, list_item) for each top-level node to render.
 
-        result = ''
+        Consecutive list blocks are grouped and yielded as normalized list trees.
+        """
         list_nodes: List[Dict] = []
 
-        for node in self._blocks:
+        for node in blocks:
 
             if list_nodes and not is_list(node):
-                tree = self._normalize_list_tree(list_nodes)
-                result += ''.join([self._render_node(n, list_item=True) for n in tree])
+                for tree_node in self._normalize_list_tree(list_nodes):
+                    yield tree_node, None, True
                 list_nodes = []  # reset list_nodes
 
             if is_list(node):
                 list_nodes.append(node)
                 continue  # handle all elements ^ when the list ends
 
-            result += self._render_node(node)  # render non-list nodes immediately
+            yield node, None, False
 
         if list_nodes:
-            tree = self._normalize_list_tree(list_nodes)
-            result += ''.join(self._render_node(n, Block(**node), list_item=True) for n in tree)
+            for tree_node in self._normalize_list_tree(list_nodes):
+                yield tree_node, list_nodes[-1], True
+
+    def _top_level_nodes(self) -> Iterable[TopLevelNode]:
+        if self._compiled_nodes is not None:
+            return self._compiled_nodes
+        return self._iter_top_level_nodes(self._blocks)
+
+    def _render_top_level_node(self, node: dict, context: Optional[dict], list_item: bool) -> str:
+        block = Block(**context, references=self._references, counters=self._counters) if context is not None else None
+        if self._fragment_cache is None or self._metadata is not None or node.get('_type') not in ('block', 'list'):
+            return self._render_node(node, block, list_item)
+
+        config = self._config_fingerprint()
+        if self._references:
+            from portabletext_html.cache import fingerprint
+            from portabletext_html.references import get_referenced
+
+            config = (config, fingerprint(get_referenced(node, self._references)))
+        if self._list_starts and node.get('_type') == 'list':
+            # Lists continuing from before a rendered range open with their position, e.g. `<ol start="4">`
+            config = (config, tuple(sorted(self._list_starts.items())))
+        return self._fragment_cache.render(node, config, list_item, lambda: self._render_node(node, block, list_item))
+
+    def _config_fingerprint(self) -> Hashable:
+        """
+        Describe the configuration that affects the rendered output, for in-process caches.
 
-        result = result.strip()
+        Holds the marker definitions and serializers themselves, so they stay alive while
+        cached and a new one is never mistaken for a garbage collected one with the same id.
+        """
+        if self._config_key is None:
+            self._config_key = (
+                self._stable_config_fingerprint(),
+                tuple(sorted(self._custom_marker_definitions.items())),
+                tuple(sorted(self._custom_serializers.items())),
+            )
+        return self._config_key
+
+    def _stable_config_fingerprint(self) -> str:
+        """Describe the configuration that affects the rendered output, stable across processes."""
+        from portabletext_html.cache import describe_callable
+
+        return self._describe_config(lambda callables: {name: describe_callable(v) for name, v in callables.items()})
+
+    def _describe_config(self, describe: Callable[[Dict[str, Any]], Dict[str, str]]) -> str:
+        from portabletext_html.cache import fingerprint
+
+        return fingerprint(
+            {
+                'marker_definitions': describe(self._custom_marker_definitions),
+                'serializers': describe(self._custom_serializers),
+                'coalesce_spans': self._coalesce_spans,
+            }
+        )
+
+    def compile(self) -> CompiledDocument:
+        """
+        Prepare the document for rendering and return it in a persistable form.
 
-        if self._wrapper_element:
-            return f'<{self._wrapper_element}>{result}</{self._wrapper_element}>'
-        return result
+        The compiled document holds the normalized list trees, with span marks
+        pre-sorted in render order, and can be saved to disk and rendered later
+        by passing it to a renderer with the same configuration.
+        """
+        from portabletext_html.compiled import CompiledDocument
+
+        return CompiledDocument(
+            nodes=[
+                (self._compile_node(node), context, list_item) for node, context, list_item in self._top_level_nodes()
+            ],
+            wrapper_element=self._wrapper_element,
+            config=self._stable_config_fingerprint(),
+        )
+
+    def _compile_node(self, node: dict) -> dict:
+        if node.get('_type') == 'list':
+            return {**node, 'children': [self._compile_node(child) for child in node.get('children', [])]}
+        if not is_block(node):
+            return node
+
+        node = self._prepare_block(node)
+        frequencies = node.pop('marker_frequencies', None) or Block(**node).marker_frequencies
+        children = []
+        for child in node.get('children', []):
+            if is_span(child) and child.get('marks'):
+                child = {**child, 'marks': sorted(child['marks'], key=lambda mark: -frequencies[mark])}
+            elif isinstance(child, dict) and child.get('_type') == 'list':
+                child = self._compile_node(child)
+            children.append(child)
+        return {**node, 'children': children}
 
     def _render_node(self, node: dict, context: Optional[Block] = None, list_item: bool = False) -> str:
         """
@@ -93,24 +457,56 @@ class PortableTextRenderer:
         :param context: Optional context. Spans are passed with a Block instance as context for mark lookups.
         :param list_item: Whether we are handling a list upstream (impacts block handling).
         """
+        if self._profile is None:
+            result = self._render_node_type(node, context, list_item)
+        else:
+            self._profile.enter()
+            try:
+                result = self._render_node_type(node, context, list_item)
+            finally:
+                self._profile.exit(get_node_type(node))
+
+        if self._counters is not None:
+            self._counters.output_chars += len(result)
+        return result
+
+    def _render_node_type(self, node: dict, context: Optional[Block], list_item: bool) -> str:
         if is_list(node):
             logger.debug('Rendering node as list')
-            block = Block(**node, marker_definitions=self._custom_marker_definitions)
+            block = Block(
+                **node,
+                marker_definitions=self._custom_marker_definitions,
+                references=self._references,
+                counters=self._counters,
+            )
             return self._render_list(block, context)
 
         elif is_block(node):
             logger.debug('Rendering node as block')
-            block = Block(**node, marker_definitions=self._custom_marker_definitions)
+            block = Block(
+                **self._prepare_block(node),
+                marker_definitions=self._custom_marker_definitions,
+                references=self._references,
+                counters=self._counters,
+            )
             return self._render_block(block, list_item=list_item)
 
         elif is_span(node):
             logger.debug('Rendering node as span')
             span = Span(**node)
+            if self._counters is not None:
+                self._counters.spans += 1
             context = cast('Block', context)  # context should always be a Block here
             return self._render_span(span, block=context)
 
         elif self._custom_serializers.get(node.get('_type', '')):
-            return self._custom_serializers.get(node.get('_type', ''))(node, context, list_item)  # type: ignore
+            serializer = self._custom_serializers[node['_type']]
+            if context is None and self._references:
+                # Top-level nodes have no block, so pass an empty one to carry the resolved references
+                context = Block(_type='block', references=self._references)
+            if self._serializer_cache is not None:
+                return self._serializer_cache.render(serializer, node, context, list_item)
+            return serializer(node, context, list_item)
 
         else:
             if '_type' in node:
@@ -120,21 +516,66 @@ class PortableTextRenderer:
             else:
                 raise UnhandledNodeError(f'Received node that we cannot handle: {node}')
 
+    def _prepare_block(self, node: dict) -> dict:
+        """Apply the optional pre-render normalization to a block node."""
+        if self._coalesce_spans and node.get('children'):
+            # Marks are nested by how often they occur in the original children, not the merged ones
+            return {
+                **node,
+                'children': coalesce_spans(node['children']),
+                'marker_frequencies': get_marker_frequencies(node['children']),
+            }
+        return node
+
     def _render_block(self, block: Block, list_item: bool = False) -> str:
+        check_deadline(self._deadline)
         text, tag = '', STYLE_MAP[block.style]
+        open_tag = f'<{tag}>'
+
+        if self._metadata is not None:
+            self._metadata.add_block(block)
+            if tag in HEADING_TAGS:
+                open_tag = f'<{tag} id="{self._metadata.add_heading(block, tag)}">'
 
         if not list_item or tag != 'p':
-            text += f'<{tag}>'
+            text += open_tag
+
+        if self._batch_escaping:
+            escaped_texts = escape_span_texts(block.children)
+            if self._counters is not None:
+                self._counters.escape_calls += 1
+        else:
+            escaped_texts = [None] * len(block.children)
 
-        for child_node in block.children:
-            text += self._render_node(child_node, context=block)
+        for child_node, escaped_text in zip(block.children, escaped_texts):
+            if escaped_text is None:
+                text += self._render_node(child_node, context=block)
+            elif self._profile is None and self._counters is None:
+                text += self._render_span(Span(**child_node), block, escaped_text)
+            else:
+                text += self._render_measured_span(Span(**child_node), block, escaped_text)
 
         if not list_item or tag != 'p':
             text += f'</{tag}>'
 
         return text
 
-    def _render_span(self, span: Span, block: Block) -> str:
+    def _render_measured_span(self, span: Span, block: Block, escaped_text: str) -> str:
+        """Render a span with pre-escaped text like the default path does, timing and counting it."""
+        if self._profile is not None:
+            self._profile.enter()
+        try:
+            result = self._render_span(span, block, escaped_text)
+        finally:
+            if self._profile is not None:
+                self._profile.exit('span')
+
+        if self._counters is not None:
+            self._counters.spans += 1
+            self._counters.output_chars += len(result)
+        return result
+
+    def _render_span(self, span: Span, block: Block, escaped_text: Optional[str] = None) -> str:
         logger.debug('Rendering span')
         result: str = ''
         prev_node, next_node = block.get_node_siblings(span)
@@ -142,46 +583,78 @@ class PortableTextRenderer:
         prev_marks = prev_node.get('marks', []) if prev_node else []
         next_marks = next_node.get('marks', []) if next_node else []
 
-        sorted_marks = sorted(span.marks, key=lambda x: -block.marker_frequencies[x])
-        for mark in sorted_marks:
+        if self._presorted_marks:
+            sorted_marks = span.marks
+        else:
+            sorted_marks = sorted(span.marks, key=lambda x: -block.marker_frequencies[x])
+        markers = [
+            (mark, self._get_marker(block.marker_definitions.get(mark, DefaultMarkerDefinition)))
+            for mark in sorted_marks
+        ]
+        for mark, marker in markers:
             if mark in prev_marks:
                 continue
 
-            marker_callable = block.marker_definitions.get(mark, DefaultMarkerDefinition)()
-            result += marker_callable.render_prefix(span, mark, block)
+            result += marker.render_prefix(span, mark, block)
 
         # to avoid rendering the text multiple times,
         # only the first custom mark will be used
         custom_mark_text_rendered = False
-        if sorted_marks:
-            for mark in sorted_marks:
-                if custom_mark_text_rendered or mark in prev_marks:
-                    continue
-                marker_callable = block.marker_definitions.get(mark, DefaultMarkerDefinition)()
-                result += marker_callable.render_text(span, mark, block)
-                custom_mark_text_rendered = True
+        for mark, marker in markers:
+            if mark in prev_marks:
+                continue
+            result += marker.render_text(span, mark, block)
+            custom_mark_text_rendered = True
+            break
 
         if not custom_mark_text_rendered:
-            result += html.escape(span.text).replace('\n', '<br/>')
+            result += escape_text(span.text) if escaped_text is None else escaped_text
+            if escaped_text is None and self._counters is not None:
+                self._counters.escape_calls += 1
 
-        for mark in reversed(sorted_marks):
+        for mark, marker in reversed(markers):
             if mark in next_marks:
                 continue
 
-            marker_callable = block.marker_definitions.get(mark, DefaultMarkerDefinition)()
-            result += marker_callable.render_suffix(span, mark, block)
+            result += marker.render_suffix(span, mark, block)
 
+        if self._counters is not None:
+            self._counters.marker_calls += (
+                sum(mark not in prev_marks for mark in sorted_marks)
+                + custom_mark_text_rendered
+                + sum(mark not in next_marks for mark in sorted_marks)
+            )
         return result
 
+    def _get_marker(self, definition: Union[Type[MarkerDefinition], MarkerDefinition]) -> MarkerDefinition:
+        """
+        Return the marker instance for a marker definition.
+
+        Marker definition classes are instantiated once per renderer and reused for every span,
+        while marker definition instances are used as they are.
+        """
+        if not isinstance(definition, type):
+            return definition
+        marker = self._markers.get(definition)
+        if marker is None:
+            marker = self._markers[definition] = definition()
+        return marker
+
     def _render_list(self, node: Block, context: Optional[Block]) -> str:
         assert node.listItem
         head, tail = get_list_tags(node.listItem)
+        start = self._list_starts.get(node._key or '')
+        if start and node.listItem == 'number':
+            head = f'<ol start="{start}">'
         result = head
         for child in node.children:
-            result += f'<li>{self._render_block(Block(**child), True)}</li>'
+            result += f'<li>{self._render_block(self._list_item_block(child), True)}</li>'
         result += tail
         return result
 
+    def _list_item_block(self, node: dict) -> Block:
+        return Block(**self._prepare_block(node), references=self._references, counters=self._counters)
+
     def _normalize_list_tree(self, nodes: list) -> list[dict]:
         tree = []
 
@@ -198,7 +671,7 @@ class PortableTextRenderer:
                 continue
 
             if node.get('level') == current_list['level'] and node.get('listItem') == current_list['listItem']:
-                current_list['children'].append(node)
+                current_list['children'].append(self._list_item_from_block(node))
                 continue
 
             if node.get('level') > current_list['level']:
@@ -211,7 +684,7 @@ class PortableTextRenderer:
                 parent = self._find_list(tree[-1], level=node.get('level'), list_item=node.get('listItem'))
                 if parent:
                     current_list = parent
-                    current_list['children'].append(node)
+                    current_list['children'].append(self._list_item_from_block(node))
                     continue
                 current_list = self._list_from_block(node)
                 tree.append(current_list)
@@ -221,7 +694,7 @@ class PortableTextRenderer:
                 match = self._find_list(tree[-1], level=node.get('level'))
                 if match and match['listItem'] == node.get('listItem'):
                     current_list = match
-                    current_list['children'].append(node)
+                    current_list['children'].append(self._list_item_from_block(node))
                     continue
                 current_list = self._list_from_block(node)
                 tree.append(current_list)
@@ -252,11 +725,38 @@ class PortableTextRenderer:
             '_key': f'${block["_key"]}-parent',
             'level': block.get('level'),
             'listItem': block['listItem'],
-            'children': [block],
+            'children': [self._list_item_from_block(block)],
         }
 
+    def _list_item_from_block(self, block: dict) -> dict:
+        """Copy a list item block so nested lists can be added without mutating the input."""
+        return {**block, 'children': list(block.get('children', []))}
+
+
+def _iter_item_positions(list_node: dict) -> Iterator[int]:
+    """Yield the position of each item in a normalized list tree within its list, in document order."""
+    for position, item in enumerate(list_node['children'], start=1):
+        yield position
+        for child in item.get('children', []):
+            if isinstance(child, dict) and child.get('_type') == 'list':
+                yield from _iter_item_positions(child)
+
+
+def _render_partition(options: dict, deadline: Optional[float], nodes: List[TopLevelNode]) -> str:
+    """Render a partition of top-level nodes in a worker process, within the time budget of the render."""
+    renderer = PortableTextRenderer([], **options)
+    renderer._deadline = deadline
+    return renderer._render_partition(nodes)
+
 
 def render(blocks: List[Dict], *args: Any, **kwargs: Any) -> str:
     """Shortcut function inspired by Sanity's own blocksToHtml.h callable."""
     renderer = PortableTextRenderer(blocks, *args, **kwargs)
     return renderer.render()
+
+
+def render_json(data: Union[bytes, str], *args: Any, **kwargs: Any) -> str:
+    """Render HTML straight from Portable Text JSON, e.g. a response body from Sanity's API."""
+    from portabletext_html.decoding import decode_json
+
+    return render(decode_json(data), *args, **kwargs)
@@ -0,0 +1,169 @@
+"""
+Shadow comparison of render engines.
+
+Before switching to a faster engine, like a specialized renderer from
+`compile_renderer`, run it in the shadow of the reference renderer on real traffic:
+
+    shadow = ShadowRenderer(compile_renderer(markers), on_report=log_report, sample_rate=0.05,
+                            reference=functools.partial(PortableTextRenderer, custom_marker_definitions=markers))
+    html = shadow.render(blocks)
+
+Callers always get the output of the reference renderer. For a sample of calls,
+the alternate engine renders the same document on a background thread, and the
+outputs and timings are compared there and reported through the callback.
+"""
+from __future__ import annotations
+
+import copy
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from portabletext_html.logger import logger
+from portabletext_html.renderer import PortableTextRenderer
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Optional, Union
+
+    RendererFactory = Callable[..., PortableTextRenderer]
+
+
+@dataclass
+class ShadowMismatch:
+    """
+    The smallest part of a document rendered differently by the two engines.
+
+    block_index is the index of the first top-level block with differing output,
+    or None when only the document as a whole differs.
+    """
+
+    block_index: Optional[int]
+    reference: str
+    alternate: str
+
+
+@dataclass
+class ShadowReport:
+    """Outcome of rendering one document with both engines."""
+
+    engine: str
+    reference_time: float
+    alternate_time: Optional[float]
+    mismatch: Optional[ShadowMismatch] = None
+    error: Optional[str] = None  # set when the alternate engine raised
+
+    @property
+    def matched(self) -> bool:
+        """Whether the alternate engine rendered output identical to the reference."""
+        return self.mismatch is None and self.error is None
+
+    @property
+    def time_delta(self) -> Optional[float]:
+        """Seconds the alternate engine took more than the reference, negative when it was faster."""
+        return self.alternate_time - self.reference_time if self.alternate_time is not None else None
+
+
+class ShadowRenderer:
+    """
+    Render with a reference renderer, comparing an alternate engine on a sample of calls.
+
+    :param alternate: Renderer class or factory for the engine under test.
+    :param on_report: Called with a `ShadowReport` for every compared document, on the background thread.
+    :param sample_rate: Share of render calls compared, from 0 to 1.
+    :param reference: Renderer class or factory whose output is returned.
+    :param max_pending: Comparisons waiting for the background thread, beyond which samples are dropped.
+    :param sampler: Returns a random number from 0 to 1 for each call, to decide whether it is sampled.
+    :param renderer_options: Keyword arguments passed on to both factories.
+    """
+
+    def __init__(
+        self,
+        alternate: RendererFactory,
+        on_report: Callable[[ShadowReport], Any],
+        sample_rate: float = 0.01,
+        reference: RendererFactory = PortableTextRenderer,
+        max_pending: int = 100,
+        sampler: Callable[[], float] = random.random,
+        **renderer_options: Any,
+    ) -> None:
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate must be between 0 and 1')
+        self.alternate = alternate
+        self.reference = reference
+        self.on_report = on_report
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.renderer_options = renderer_options
+        self.engine = getattr(alternate, '__qualname__', None) or type(alternate).__qualname__
+        self.dropped = 0
+        self._sampler = sampler
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def render(self, blocks: Union[list, dict]) -> str:
+        """Render blocks with the reference renderer, scheduling a comparison for sampled calls."""
+        start = time.perf_counter()
+        html = self.reference(blocks, **self.renderer_options).render()
+        reference_time = time.perf_counter() - start
+
+        if self.sample_rate and self._sampler() < self.sample_rate:
+            self._schedule(blocks, html, reference_time)
+        return html
+
+    def close(self) -> None:
+        """Wait for scheduled comparisons to finish and stop the background thread."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def compare(self, blocks: Union[list, dict], html: str, reference_time: float) -> ShadowReport:
+        """Render blocks with the alternate engine and compare the output to the reference html."""
+        start = time.perf_counter()
+        try:
+            alternate_html = self.alternate(blocks, **self.renderer_options).render()
+        except Exception as e:
+            return ShadowReport(self.engine, reference_time, None, error=f'{type(e).__name__}: {e}')
+        alternate_time = time.perf_counter() - start
+
+        mismatch = None
+        if alternate_html != html:
+            mismatch = self._find_mismatch(blocks, html, alternate_html)
+        return ShadowReport(self.engine, reference_time, alternate_time, mismatch)
+
+    def _schedule(self, blocks: Union[list, dict], html: str, reference_time: float) -> None:
+        # Compare against a snapshot, since callers may modify the document once render returns.
+        # Taken before locking, so concurrent renders are not serialized on copying documents
+        snapshot = copy.deepcopy(blocks)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='portabletext-shadow')
+            self._executor.submit(self._run, snapshot, html, reference_time)
+
+    def _run(self, blocks: Union[list, dict], html: str, reference_time: float) -> None:
+        try:
+            self.on_report(self.compare(blocks, html, reference_time))
+        except Exception:
+            logger.exception('Shadow comparison failed')
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _find_mismatch(self, blocks: Union[list, dict], html: str, alternate_html: str) -> ShadowMismatch:
+        """Narrow a differing document down to the first top-level block rendered differently."""
+        nodes = blocks if isinstance(blocks, list) else [blocks]
+        reference = self.reference(nodes, **self.renderer_options)
+        alternate = self.alternate(nodes, **self.renderer_options)
+        for index in range(len(nodes)):
+            expected, actual = reference.render_range(index, index + 1), alternate.render_range(index, index + 1)
+            if expected != actual:
+                return ShadowMismatch(index, expected, actual)
+        return ShadowMismatch(None, html, alternate_html)
@@ -0,0 +1,92 @@
+"""
+Streaming, optionally compressed, output.
+
+Rendered chunks are encoded and fed to an incremental compressor as they are
+produced, so the full HTML never has to exist as one string or byte string:
+
+    with open('document.html.gz', 'wb') as f:
+        PortableTextRenderer(blocks).render_to(f, compression='gzip')
+
+gzip is always available. brotli requires the `brotli` package to be installed.
+"""
+from __future__ import annotations
+
+import gzip
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional
+
+COMPRESSIONS = ('gzip', 'brotli')
+BUFFER_SIZE = 64 * 1024  # characters collected before encoding them and handing them to the compressor
+
+
+def strip_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Strip leading and trailing whitespace from a stream of chunks, like `''.join(chunks).strip()`.
+
+    Trailing whitespace of a chunk is held back until a later chunk shows it is not at the end.
+    """
+    started = False
+    pending = ''
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        stripped = chunk.rstrip()
+        if not stripped:
+            pending += chunk
+            continue
+        yield pending + stripped
+        pending = chunk[len(stripped) :]  # noqa: E203
+
+
+def write_chunks(
+    chunks: Iterable[str], target: BinaryIO, compression: Optional[str] = None, encoding: str = 'utf-8'
+) -> int:
+    """
+    Encode chunks and write them to a binary file-like target, optionally compressed.
+
+    Returns the number of uncompressed bytes written. The target is not closed.
+
+    :param compression: None, 'gzip' or 'brotli'.
+    """
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f'Unknown compression: {compression}')
+
+    if compression == 'gzip':
+        with gzip.GzipFile(fileobj=target, mode='wb', mtime=0) as f:
+            return _write_buffered(chunks, f.write, encoding)
+
+    if compression == 'brotli':
+        try:
+            import brotli
+        except ImportError:
+            raise ValueError('brotli compression requires the brotli package to be installed') from None
+        compressor = brotli.Compressor()
+        written = _write_buffered(chunks, lambda data: target.write(compressor.process(data)), encoding)
+        target.write(compressor.finish())
+        return written
+
+    return _write_buffered(chunks, target.write, encoding)
+
+
+def _write_buffered(chunks: Iterable[str], write: Callable[[bytes], object], encoding: str) -> int:
+    """Encode and write chunks in blocks of about BUFFER_SIZE characters, since rendered chunks are often tiny."""
+    buffer: List[str] = []
+    buffered = written = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= BUFFER_SIZE:
+            data = ''.join(buffer).encode(encoding)
+            write(data)
+            written += len(data)
+            buffer, buffered = [], 0
+    if buffer:
+        data = ''.join(buffer).encode(encoding)
+        write(data)
+        written += len(data)
+    return written
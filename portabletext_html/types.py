@@ -3,12 +3,13 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
-from portabletext_html.utils import get_default_marker_definitions
+from portabletext_html.utils import get_default_marker_definitions, get_marker_frequencies
 
 if TYPE_CHECKING:
-    from typing import Literal, Optional, Tuple, Type, Union
+    from typing import Any, Literal, Mapping, Optional, Tuple, Type, Union
 
     from portabletext_html.marker_definitions import MarkerDefinition
+    from portabletext_html.profiling import RenderCounters
 
 
 @dataclass(frozen=True)
@@ -43,8 +44,12 @@ class Block:
     listItem: Optional[Literal['bullet', 'number', 'square']] = None
     children: list[dict] = field(default_factory=list)
     markDefs: list[dict] = field(default_factory=list)
-    marker_definitions: dict[str, Type[MarkerDefinition]] = field(default_factory=dict)
-    marker_frequencies: dict[str, int] = field(init=False)
+    marker_definitions: dict[str, Union[Type[MarkerDefinition], MarkerDefinition]] = field(default_factory=dict)
+    marker_frequencies: dict[str, int] = field(default_factory=dict)  # computed from children when not given
+    references: Mapping[str, Any] = field(default_factory=dict)  # resolved `_ref` values, by ID
+    counters: Optional[RenderCounters] = field(default=None, repr=False, compare=False)
+    _text_indexes: Optional[dict[str, int]] = field(default=None, init=False, repr=False, compare=False)
+    _mark_defs_by_key: Optional[dict[str, dict]] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """
@@ -54,20 +59,15 @@ class Block:
         we can directly look up both annotation marks or decorator marks.
         """
         self.marker_definitions = self._add_custom_marker_definitions()
-        self.marker_frequencies = self._compute_marker_frequencies()
-
-    def _compute_marker_frequencies(self) -> dict[str, int]:
-        counts: dict[str, int] = {}
-        for child in self.children:
-            for mark in child.get('marks', []):
-                if mark in counts:
-                    counts[mark] += 1
-                else:
-                    counts[mark] = 0
-        return counts
-
-    def _add_custom_marker_definitions(self) -> dict[str, Type[MarkerDefinition]]:
-        marker_definitions = get_default_marker_definitions(self.markDefs)
+        if not self.marker_frequencies:
+            self.marker_frequencies = get_marker_frequencies(self.children)
+        if self.counters is not None:
+            self.counters.blocks += 1
+
+    def _add_custom_marker_definitions(self) -> dict[str, Union[Type[MarkerDefinition], MarkerDefinition]]:
+        marker_definitions: dict[str, Union[Type[MarkerDefinition], MarkerDefinition]] = {
+            **get_default_marker_definitions(self.markDefs)
+        }
         marker_definitions.update(self.marker_definitions)
         for definition in self.markDefs:
             if definition['_type'] in self.marker_definitions:
@@ -80,18 +80,17 @@ class Block:
         """Return the sibling nodes (prev, next) to the given node."""
         if not self.children:
             return None, None
+        if self.counters is not None:
+            self.counters.sibling_lookups += 1
         try:
             if type(node) == dict:
                 node_idx = self.children.index(node)
             elif type(node) == Span:
-                for index, item in enumerate(self.children):
-                    if 'text' in item and node.text == item['text']:
-                        # Is it possible to handle several identical texts?
-                        node_idx = index
-                        break
+                # Is it possible to handle several identical texts? The first child with the text is used
+                node_idx = self._get_text_indexes()[node.text]
             else:
                 raise ValueError(f'Expected dict or Span but received {type(node)}')
-        except ValueError:
+        except (ValueError, KeyError):
             return None, None
 
         next_node = None
@@ -101,3 +100,26 @@ class Block:
             next_node = self.children[node_idx + 1]
 
         return prev_node, next_node
+
+    def get_mark_definition(self, key: str) -> Optional[dict]:
+        """Return the entry in markDefs with the given key."""
+        if self._mark_defs_by_key is None:
+            self._mark_defs_by_key = {}
+            for definition in self.markDefs:
+                self._mark_defs_by_key.setdefault(definition['_key'], definition)
+            if self.counters is not None:
+                self.counters.mark_def_scan_steps += len(self.markDefs)
+        if self.counters is not None:
+            self.counters.mark_def_lookups += 1
+        return self._mark_defs_by_key.get(key)
+
+    def _get_text_indexes(self) -> dict[str, int]:
+        """Map the text of each child to its index, built once per block so sibling lookups are constant time."""
+        if self._text_indexes is None:
+            self._text_indexes = {}
+            for index, item in enumerate(self.children):
+                if 'text' in item:
+                    self._text_indexes.setdefault(item['text'], index)
+            if self.counters is not None:
+                self.counters.sibling_scan_steps += len(self.children)
+        return self._text_indexes
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import html
+import re
 from typing import TYPE_CHECKING
 
 from portabletext_html.constants import ANNOTATION_MARKER_DEFINITIONS, DECORATOR_MARKER_DEFINITIONS
 
 if TYPE_CHECKING:
-    from typing import Type
+    from typing import Optional, Type
 
     from portabletext_html.marker_definitions import MarkerDefinition
 
@@ -42,6 +44,123 @@ def is_block(node: dict) -> bool:
     return node.get('_type') == 'block'
 
 
+def coalesce_spans(children: list[dict]) -> list[dict]:
+    """
+    Merge adjacent spans with equal mark sets, where that does not change the markup.
+
+    Editors often split a run of identically marked text into many spans. Within
+    such a run, only the first span renders its text through the marker definitions;
+    the others are escaped like unmarked text, so those can be joined up front, and
+    dropped when they render nothing. Runs of unmarked spans are joined
+    entirely. The input dicts are never mutated; merged spans are new dicts based
+    on the last merged span, which decides the order of the closing tags.
+
+    Spans find their siblings by their text, so children are returned as they are
+    when texts repeat, either before or after merging.
+
+    Merging lowers the mark counts that decide the nesting order of marks, so blocks
+    should be rendered with the frequencies of the original children, see
+    `get_marker_frequencies`.
+    """
+    if not _has_unique_texts(children):
+        return list(children)
+    result: list[dict] = []
+    run: list[dict] = []
+
+    def flush() -> None:
+        if not run:
+            return
+        marked = bool(run[0].get('marks'))
+        if marked:
+            result.append(run[0])
+        continuation = run[1:] if marked else run
+        if continuation:
+            # The last span closes the marks, in the order of its own mark list
+            span = {**continuation[-1], 'text': ''.join(span['text'] for span in continuation)}
+            if span['text'] or not marked or span['marks'] != run[0]['marks']:
+                result.append(span if len(continuation) > 1 else continuation[0])
+        run.clear()
+
+    for child in children:
+        if child.get('_type') != 'span' or not isinstance(child.get('text'), str):
+            flush()
+            result.append(child)
+            continue
+        if run and set(run[-1].get('marks', [])) != set(child.get('marks', [])):
+            flush()
+        run.append(child)
+
+    flush()
+    return result if _has_unique_texts(result) else list(children)
+
+
+def _has_unique_texts(children: list[dict]) -> bool:
+    texts = [child['text'] for child in children if 'text' in child]
+    return len(set(texts)) == len(texts)
+
+
+def get_marker_frequencies(children: list[dict]) -> dict[str, int]:
+    """Count the spans each mark occurs in, less one, which orders the nesting of marks."""
+    counts: dict[str, int] = {}
+    for child in children:
+        for mark in child.get('marks', []):
+            if mark in counts:
+                counts[mark] += 1
+            else:
+                counts[mark] = 0
+    return counts
+
+
+def escape_text(text: str) -> str:
+    """Escape span text for HTML output, converting newlines to line breaks."""
+    return html.escape(text).replace('\n', '<br/>')
+
+
+ESCAPE_SEPARATOR = '\x00'
+
+
+def escape_span_texts(children: list[dict]) -> list[Optional[str]]:
+    """
+    Escape the text of all plain spans in one batched operation.
+
+    Returns a list aligned with children, holding the escaped text for every span
+    with string text and None for anything else. The result is identical to calling
+    escape_text on each span, but joining the texts first saves thousands of small
+    calls and temporary strings on large documents.
+    """
+    positions = [
+        index
+        for index, child in enumerate(children)
+        if child.get('_type') == 'span' and isinstance(child.get('text'), str)
+    ]
+    result: list[Optional[str]] = [None] * len(children)
+    if not positions:
+        return result
+
+    texts = [children[index]['text'] for index in positions]
+    joined = ESCAPE_SEPARATOR.join(texts)
+    if joined.count(ESCAPE_SEPARATOR) == len(texts) - 1:
+        escaped = escape_text(joined).split(ESCAPE_SEPARATOR)
+    else:  # the separator occurs in the text itself
+        escaped = [escape_text(text) for text in texts]
+
+    for index, text in zip(positions, escaped):
+        result[index] = text
+    return result
+
+
+def get_node_type(node: dict) -> str:
+    """Return a short name for the kind of node, e.g. for profiling output."""
+    if is_list(node):
+        return 'list'
+    return str(node.get('_type', 'unknown'))
+
+
+def slugify(text: str) -> str:
+    """Turn text into a string usable as an HTML id attribute, e.g. for heading anchors."""
+    return re.sub(r'[\W_]+', '-', text.lower()).strip('-') or 'section'
+
+
 def get_list_tags(list_item: str) -> tuple[str, str]:
     """Return the appropriate list tags for a given list item."""
     # TODO: Make it possible for users to pass their own maps, perhaps by adding this to the class
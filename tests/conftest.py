@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from portabletext_html.types import Block
+from tests.helpers import INLINE_TYPES
+
+UPSTREAM_FIXTURES = sorted((Path(__file__).parent / 'fixtures' / 'upstream').glob('*.json'))
+
+
+def inline_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+    return f'<span class="{node["_type"]}"></span>'
+
+
+@pytest.fixture()
+def serializers() -> dict:
+    """Serializers for the custom types in the upstream fixtures."""
+    return {name: inline_serializer for name in INLINE_TYPES}
+
+
+@pytest.fixture(params=UPSTREAM_FIXTURES, ids=lambda path: path.stem)
+def upstream_blocks(request):
+    """The input blocks of each upstream fixture."""
+    return json.loads(request.param.read_text())['input']
+
+
+@pytest.fixture()
+def upstream_documents() -> list:
+    """The input blocks of all upstream fixtures."""
+    return [json.loads(path.read_text())['input'] for path in UPSTREAM_FIXTURES]
@@ -0,0 +1,11 @@
+from typing import List, Optional
+
+INLINE_TYPES = ('image', 'button', 'author', 'code')  # custom types used in the upstream fixtures
+
+
+def make_block(text: str = 'text', marks: Optional[List[str]] = None, **fields) -> dict:
+    """Return a block with a single span, with any other block fields passed as keyword arguments."""
+    span = {'_type': 'span', 'text': text}
+    if marks is not None:
+        span['marks'] = marks
+    return {'_type': 'block', 'children': [span], **fields}
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from portabletext_html.asgi import RenderApp
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def request(app, method: str, path: str, body: bytes = b'', headers=None, chunk_size: int = 64):
+    """Call the ASGI app in-process and return (status, headers, body chunks)."""
+    chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)] or [b'']
+    incoming = [
+        {'type': 'http.request', 'body': chunk, 'more_body': index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'headers': headers or []}
+    asyncio.run(app(scope, receive, send))
+
+    start = sent[0]
+    return start['status'], dict(start['headers']), [message['body'] for message in sent[1:]]
+
+
+def test_render():
+    app = RenderApp()
+    body = (FIXTURES / 'nested_marks.json').read_bytes()
+    status, headers, chunks = request(app, 'POST', '/render', body)
+
+    assert status == 200
+    assert b''.join(chunks) == b'<p><strong>A word of <em>warning;</em></strong> Sanity is addictive.</p>'
+    assert headers[b'content-type'] == b'text/html; charset=utf-8'
+    assert headers[b'etag'] == app.get_etag(body).encode()
+
+
+def test_conditional_request_skips_rendering():
+    app = RenderApp()
+    body = (FIXTURES / 'simple_span.json').read_bytes()
+    etag = app.get_etag(body).encode()
+
+    status, headers, chunks = request(app, 'POST', '/render', body, [(b'if-none-match', b'"other", ' + etag)])
+    assert status == 304
+    assert chunks == [b'']
+    assert headers[b'etag'] == etag
+    assert len(app.cache) == 0
+
+
+def test_render_cache():
+    app = RenderApp()
+    body = (FIXTURES / 'simple_span.json').read_bytes()
+    request(app, 'POST', '/render', body)
+    request(app, 'POST', '/render', body)
+    assert app.cache.stats.hits == 1
+    assert app.cache.stats.misses == 1
+
+
+def test_etag_depends_on_configuration():
+    body = (FIXTURES / 'simple_span.json').read_bytes()
+    assert RenderApp().get_etag(body) != RenderApp(coalesce_spans=True).get_etag(body)
+
+
+def test_render_batch_streams_results():
+    documents = [(FIXTURES / name).read_text() for name in ('simple_span.json', 'invalid_type.json', 'basic_mark.json')]
+    body = '\n'.join(json.dumps(json.loads(document)) for document in documents).encode()
+    status, headers, chunks = request(RenderApp(), 'POST', '/render/batch', body)
+
+    assert status == 200
+    assert headers[b'content-type'] == b'application/x-ndjson'
+    assert len(chunks) == 4  # one chunk per document, then the end of the body
+    results = [json.loads(chunk) for chunk in chunks[:-1]]
+    assert results[0] == '<p>Otovo guarantee is good</p>'
+    assert 'error' in results[1]
+    assert results[2] == '<p><code>sanity</code> is the name of the CLI tool.</p>'
+
+
+def test_errors():
+    app = RenderApp()
+    assert request(app, 'POST', '/render', (FIXTURES / 'invalid_type.json').read_bytes())[0] == 422
+    assert request(app, 'POST', '/render', b'{not json')[0] == 422
+    assert request(app, 'GET', '/render')[0] == 405
+    assert request(app, 'POST', '/')[0] == 404
+
+
+def test_document_errors_are_reported_per_document():
+    def image_serializer(node, context, list_item):
+        return node['url']
+
+    app = RenderApp(custom_serializers={'image': image_serializer})
+    heading = {'_type': 'block', 'style': 'h7', 'children': [{'_type': 'span', 'text': 'a'}]}
+    status, _, chunks = request(app, 'POST', '/render', json.dumps(heading).encode())
+    assert status == 422
+    assert chunks == [b"KeyError: 'h7'"]
+    assert request(app, 'POST', '/render', b'{"_type": "image"}')[0] == 422
+
+    body = b'\n'.join([json.dumps(heading).encode(), b'{"_type": "image"}', b'{"_type": "image", "url": "a.png"}'])
+    status, _, chunks = request(app, 'POST', '/render/batch', body)
+    assert status == 200
+    assert [json.loads(chunk) for chunk in chunks[:-1]] == [
+        {'error': "KeyError: 'h7'"},
+        {'error': "KeyError: 'url'"},
+        'a.png',
+    ]
+
+
+def test_lifespan():
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(RenderApp()({'type': 'lifespan'}, receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
@@ -0,0 +1,222 @@
+from typing import Optional
+
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.cache import FragmentCache, LRUCache, SerializerCache, content_fingerprint, fingerprint
+from portabletext_html.types import Block
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({'a': 1, 'b': [1, 2]}) == fingerprint({'b': [1, 2], 'a': 1})
+    assert fingerprint({'a': 1}) != fingerprint({'a': 2})
+
+
+def test_lru_cache_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)  # evicts b, the least recently used entry
+
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+
+
+def test_lru_cache_ttl():
+    timer = FakeTimer()
+    cache = LRUCache(ttl=10, timer=timer)
+    cache.set('a', 1)
+    timer.now = 9
+    assert cache.get('a') == 1
+    timer.now = 10
+    assert cache.get('a') is None
+    assert cache.stats.expirations == 1
+
+
+def test_lru_cache_invalid_size():
+    with pytest.raises(ValueError, match='maxsize'):
+        LRUCache(maxsize=0)
+
+
+def test_serializer_cache():
+    calls = []
+
+    def image_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+        calls.append(node['_key'])
+        return f'<img src="{node["url"]}"/>'
+
+    cache = SerializerCache()
+    blocks = [
+        {'_type': 'image', '_key': 'a', 'url': 'https://example.com/1.png'},
+        {'_type': 'image', '_key': 'a', 'url': 'https://example.com/1.png'},
+        {'_type': 'image', '_key': 'b', 'url': 'https://example.com/2.png'},
+    ]
+    for _ in range(2):
+        renderer = PortableTextRenderer(blocks, custom_serializers={'image': image_serializer}, serializer_cache=cache)
+        assert renderer.render() == (
+            '<div><img src="https://example.com/1.png"/><img src="https://example.com/1.png"/>'
+            '<img src="https://example.com/2.png"/></div>'
+        )
+
+    assert calls == ['a', 'b']
+    assert cache.stats.hits == 4
+    assert cache.stats.misses == 2
+    assert cache.stats_by_type['image'].hit_rate == pytest.approx(4 / 6)
+
+
+def test_serializer_cache_keys_on_context():
+    def button_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+        return f'<button>{node["text"]}</button>' if context else f'<p>{node["text"]}</p>'
+
+    cache = SerializerCache()
+    button = {'_type': 'button', 'text': 'here'}
+    blocks = [button, {'_type': 'block', 'children': [button], 'markDefs': []}]
+    output = PortableTextRenderer(
+        blocks, custom_serializers={'button': button_serializer}, serializer_cache=cache
+    ).render()
+
+    assert output == '<div><p>here</p><p><button>here</button></p></div>'
+    assert cache.stats.misses == 2
+
+
+def test_serializer_cache_type_filters():
+    cache = SerializerCache(types=['image', 'youtube'], exclude=['youtube'])
+    assert cache.is_cached_type('image')
+    assert not cache.is_cached_type('youtube')
+    assert not cache.is_cached_type('reference')
+
+    calls = []
+
+    def reference_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+        calls.append(node)
+        return ''
+
+    for _ in range(2):
+        cache.render(reference_serializer, {'_type': 'reference'}, None, False)
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+    cache.clear()
+    assert cache.stats_by_type == {}
+
+
+def disclaimer(key: str) -> list:
+    return [
+        {
+            '_type': 'block',
+            '_key': key,
+            'children': [{'_type': 'span', '_key': f'{key}-span', 'marks': ['link'], 'text': 'Terms apply'}],
+            'markDefs': [{'_type': 'link', '_key': 'link', 'href': 'https://example.com/terms'}],
+        },
+        {
+            '_type': 'block',
+            '_key': f'{key}-1',
+            'listItem': 'bullet',
+            'level': 1,
+            'children': [{'_type': 'span', 'text': 'a'}],
+        },
+        {
+            '_type': 'block',
+            '_key': f'{key}-2',
+            'listItem': 'bullet',
+            'level': 2,
+            'children': [{'_type': 'span', 'text': 'b'}],
+        },
+    ]
+
+
+def test_content_fingerprint_ignores_keys_but_not_mark_definitions():
+    assert content_fingerprint(disclaimer('a')[0]) == content_fingerprint(disclaimer('b')[0])
+
+    block = disclaimer('a')[0]
+    block['markDefs'][0]['_key'] = 'other'
+    assert content_fingerprint(block) != content_fingerprint(disclaimer('a')[0])
+
+
+def test_fragment_cache():
+    cache = FragmentCache()
+    expected = (
+        '<div><p><a href="https://example.com/terms">Terms apply</a></p>' '<ul><li>a<ul><li>b</li></ul></li></ul></div>'
+    )
+    assert PortableTextRenderer(disclaimer('first'), fragment_cache=cache).render() == expected
+    assert cache.stats.misses == 2  # the block and the list group
+    assert cache.stats.hits == 0
+
+    assert PortableTextRenderer(disclaimer('second'), fragment_cache=cache).render() == expected
+    assert cache.stats.hits == 2
+    assert len(cache) == 2
+
+
+def test_fragment_cache_keys_on_configuration():
+    def image_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+        return '<img/>'
+
+    cache = FragmentCache()
+    PortableTextRenderer(disclaimer('a'), fragment_cache=cache).render()
+    PortableTextRenderer(disclaimer('a'), fragment_cache=cache, custom_serializers={'image': image_serializer}).render()
+    assert cache.stats.hits == 0
+    assert len(cache) == 4
+
+
+def test_serializer_cache_does_not_reuse_output_of_collected_serializers():
+    def make_serializers(locale: str) -> dict:
+        def image_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+            return f'<img alt="{locale}"/>'
+
+        return {'image': image_serializer}
+
+    cache = SerializerCache()
+    for locale in ['en', 'no', 'de']:
+        renderer = PortableTextRenderer(
+            {'_type': 'image'}, custom_serializers=make_serializers(locale), serializer_cache=cache
+        )
+        assert renderer.render() == f'<img alt="{locale}"/>'
+    assert cache.stats_by_type['image'].misses == 3
+
+
+def test_fragment_cache_does_not_reuse_fragments_of_collected_serializers():
+    def make_serializers(locale: str) -> dict:
+        def image_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+            return f'<img alt="{locale}"/>'
+
+        return {'image': image_serializer}
+
+    cache = FragmentCache()
+    block = {'_type': 'block', 'children': [{'_type': 'image'}], 'markDefs': []}
+    for locale in ['en', 'no', 'de']:
+        renderer = PortableTextRenderer(block, custom_serializers=make_serializers(locale), fragment_cache=cache)
+        assert renderer.render() == f'<p><img alt="{locale}"/></p>'
+
+
+def test_fragment_cache_keys_on_keys_of_custom_nodes():
+    def anchor_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+        return f'<a id="{node["_key"]}"></a>'
+
+    def document(key: str) -> dict:
+        return {
+            '_type': 'block',
+            '_key': f'block-{key}',
+            'children': [{'_type': 'anchor', '_key': key}],
+            'markDefs': [],
+        }
+
+    cache = FragmentCache()
+    for key in ['k1', 'k2']:
+        renderer = PortableTextRenderer(
+            document(key), custom_serializers={'anchor': anchor_serializer}, fragment_cache=cache
+        )
+        assert renderer.render() == f'<p><a id="{key}"></a></p>'
+    assert content_fingerprint(document('k1')) != content_fingerprint(document('k2'))
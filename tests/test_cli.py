@@ -0,0 +1,93 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from portabletext_html.cli import main
+from portabletext_html.profiling import RenderProfile, percentile
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+@pytest.fixture()
+def ndjson_file(tmp_path):
+    path = tmp_path / 'documents.ndjson'
+    documents = [json.loads((FIXTURES / name).read_text()) for name in ('simple_span.json', 'nested_marks.json')]
+    path.write_text('\n'.join(json.dumps(document) for document in documents) + '\n\n')
+    return path
+
+
+def test_render_json_file(capsys):
+    assert main([str(FIXTURES / 'simple_span.json')]) == 0
+    assert capsys.readouterr().out == '<p>Otovo guarantee is good</p>\n'
+
+
+def test_render_stdin(capsys, monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO((FIXTURES / 'basic_mark.json').read_text()))
+    assert main([]) == 0
+    assert capsys.readouterr().out == '<p><code>sanity</code> is the name of the CLI tool.</p>\n'
+
+
+def test_render_ndjson_file(capsys, ndjson_file):
+    assert main([str(ndjson_file)]) == 0
+    assert capsys.readouterr().out == (
+        '<p>Otovo guarantee is good</p>\n' '<p><strong>A word of <em>warning;</em></strong> Sanity is addictive.</p>\n'
+    )
+
+
+def test_render_with_workers(capsys, ndjson_file):
+    assert main(['--workers', '2', str(ndjson_file)]) == 0
+    assert capsys.readouterr().out.count('\n') == 2
+
+
+def test_profile(capsys, ndjson_file):
+    assert main(['--profile', str(ndjson_file)]) == 0
+    output = capsys.readouterr()
+    assert output.out.count('\n') == 2
+    assert output.err.splitlines()[0].split() == ['node', 'type', 'count', 'total', 'ms', 'own', 'ms', 'own', 'us/node']
+    assert {line.split()[0] for line in output.err.splitlines()[1:]} == {'block', 'span'}
+
+
+def test_bench(capsys, ndjson_file):
+    assert main(['--bench', '5', str(ndjson_file)]) == 0
+    output = capsys.readouterr().out
+    assert output.startswith('documents: 2, renders: 10\n')
+    assert 'p99: ' in output
+    assert 'documents/s' in output
+
+
+def test_errors(capsys, tmp_path):
+    assert main([str(tmp_path / 'missing.json')]) == 2
+    assert main([str(FIXTURES / 'invalid_type.json')]) == 1
+    assert 'Could not render document' in capsys.readouterr().err
+
+
+def test_programming_errors_are_not_reported_as_render_errors(monkeypatch):
+    def render_document(*args):
+        raise KeyError('bug')
+
+    monkeypatch.setattr('portabletext_html.cli._render_document', render_document)
+    with pytest.raises(KeyError):
+        main([str(FIXTURES / 'simple_span.json')])
+
+
+def test_render_profile():
+    profile = RenderProfile()
+    profile.enter()
+    profile.enter()
+    profile.exit('span')
+    profile.exit('block')
+
+    assert profile.timings['span'].count == 1
+    assert profile.timings['block'].total >= profile.timings['span'].total
+    assert profile.timings['block'].own <= profile.timings['block'].total
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 90) == 3
+    with pytest.raises(ValueError, match='percentile'):
+        percentile([], 50)
@@ -0,0 +1,71 @@
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.codegen import SpecializedRendererMismatchError, compile_renderer
+from portabletext_html.marker_definitions import MarkerDefinition
+from portabletext_html.types import Block, Span
+from tests.helpers import make_block
+
+
+class HighlightMarkerDefinition(MarkerDefinition):
+    tag = 'mark'
+
+
+class TitledLinkMarkerDefinition(MarkerDefinition):
+    tag = 'a'
+
+    @classmethod
+    def render_prefix(cls, span: Span, marker: str, context: Block) -> str:
+        return f'<a title="{marker}">'
+
+    @classmethod
+    def render_text(cls, span: Span, marker: str, context: Block) -> str:
+        return str(span.text).upper()
+
+
+MARKERS = {'em': HighlightMarkerDefinition, 'link': TitledLinkMarkerDefinition}
+
+
+@pytest.mark.parametrize('markers', [{}, MARKERS], ids=['default', 'custom'])
+def test_specialized_renderer_matches_generic(upstream_blocks, serializers, markers):
+    renderer_class = compile_renderer(markers, serializers)
+    expected = PortableTextRenderer(upstream_blocks, markers, serializers).render()
+    assert renderer_class(upstream_blocks).render() == expected
+
+
+def test_specialized_renderer_is_cached_per_configuration(serializers):
+    assert compile_renderer(MARKERS, serializers) is compile_renderer(dict(MARKERS), dict(serializers))
+    assert compile_renderer(MARKERS, serializers) is not compile_renderer({}, serializers)
+
+
+def test_specialized_renderer_inlines_static_tags():
+    renderer_class = compile_renderer(MARKERS)
+    assert "result += '<mark>'" in renderer_class._source
+    assert "suffixes.append('</a>')" in renderer_class._source
+    assert "result += '<a title=" not in renderer_class._source
+
+
+def test_specialized_renderer_options():
+    block = {
+        '_type': 'block',
+        'children': [
+            {'_key': 'a', '_type': 'span', 'marks': ['em'], 'text': 'a'},
+            {'_key': 'b', '_type': 'span', 'marks': ['em'], 'text': 'b'},
+        ],
+        'markDefs': [],
+    }
+    renderer_class = compile_renderer(MARKERS)
+    assert renderer_class(block, coalesce_spans=True).render() == '<p><mark>ab</mark></p>'
+
+
+def test_specialized_renderer_verifies_samples(upstream_documents):
+    assert compile_renderer(MARKERS, samples=[upstream_documents[0]]) is compile_renderer(MARKERS)
+
+    class Mismatching(MarkerDefinition):
+        tag = 'em'
+
+    renderer_class = compile_renderer({'em': Mismatching})
+    renderer_class._render_span = lambda self, span, block, escaped_text=None: ''
+    sample = make_block(marks=[], markDefs=[])
+    with pytest.raises(SpecializedRendererMismatchError):
+        compile_renderer({'em': Mismatching}, samples=[sample])
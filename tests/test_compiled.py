@@ -0,0 +1,97 @@
+import copy
+
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.compiled import CompiledDocument, IncompatibleCompiledDocumentError
+from portabletext_html.limits import RenderLimitExceededError, RenderLimits
+from portabletext_html.marker_definitions import EmphasisMarkerDefinition
+from tests.helpers import make_block
+
+
+def test_compiled_document_round_trip(upstream_blocks, serializers, tmp_path):
+    expected = PortableTextRenderer(copy.deepcopy(upstream_blocks), custom_serializers=serializers).render()
+
+    PortableTextRenderer(upstream_blocks, custom_serializers=serializers).compile().save(tmp_path / 'document.pthc')
+    compiled = CompiledDocument.load(tmp_path / 'document.pthc')
+    assert PortableTextRenderer(compiled, custom_serializers=serializers).render() == expected
+
+
+def test_compiled_document_sorts_marks():
+    block = {
+        '_type': 'block',
+        'children': [
+            {'_type': 'span', 'text': 'a', 'marks': ['em', 'strong']},
+            {'_type': 'span', 'text': 'b', 'marks': ['strong']},
+            {'_type': 'span', 'text': 'c', 'marks': ['strong']},
+            {'_type': 'span', 'text': 'd', 'marks': ['strong']},
+        ],
+    }
+    compiled = PortableTextRenderer(block, coalesce_spans=True).compile()
+    node, context, list_item = compiled.nodes[0]
+    assert node['children'] == [
+        {'_type': 'span', 'text': 'a', 'marks': ['strong', 'em']},
+        {'_type': 'span', 'text': 'b', 'marks': ['strong']},
+        {'_type': 'span', 'text': 'cd', 'marks': ['strong']},
+    ]
+    assert block['children'][0]['marks'] == ['em', 'strong']
+    assert PortableTextRenderer(compiled, coalesce_spans=True).render() == '<p><strong><em>a</em>bcd</strong></p>'
+
+
+def test_compiled_document_renders_stored_mark_order():
+    item = {
+        '_type': 'block',
+        'listItem': 'bullet',
+        'level': 1,
+        '_key': 'a',
+        'children': [
+            {'_type': 'span', 'text': 'a', 'marks': ['em', 'strong']},
+            {'_type': 'span', 'text': 'b', 'marks': ['strong']},
+        ],
+    }
+    compiled = PortableTextRenderer([item]).compile()
+    list_node, _, _ = compiled.nodes[0]
+    assert list_node['children'][0]['children'][0]['marks'] == ['strong', 'em']
+
+    # Marks are rendered in the stored order, without sorting them again
+    list_node['children'][0]['children'][0]['marks'] = ['em', 'strong']
+    assert PortableTextRenderer(compiled).render() == '<ul><li><em><strong>a</em>b</strong></li></ul>'
+
+
+def test_compiled_document_render_limits():
+    item = make_block('a', listItem='bullet', level=1, _key='a')
+    nested = {**item, '_key': 'b', 'level': 2}
+    blocks = [
+        {'_type': 'block', 'children': [{'_type': 'span', 'text': str(i)} for i in range(150)]},
+        item,
+        nested,
+    ]
+    compiled = PortableTextRenderer(blocks).compile()
+
+    with pytest.raises(RenderLimitExceededError, match='150 children'):
+        PortableTextRenderer(compiled, limits=RenderLimits(max_spans_per_block=5)).render()
+    with pytest.raises(RenderLimitExceededError, match='more than 3 nodes'):
+        PortableTextRenderer(compiled, limits=RenderLimits(max_nodes=3)).render_parallel()
+    with pytest.raises(RenderLimitExceededError, match='level 2'):
+        PortableTextRenderer(compiled, limits=RenderLimits(max_list_depth=1)).render()
+    assert PortableTextRenderer(compiled, limits=RenderLimits(max_spans_per_block=150, max_list_depth=2)).render()
+
+
+def test_compiled_document_configuration_mismatch():
+    compiled = PortableTextRenderer([], custom_marker_definitions={'em': EmphasisMarkerDefinition}).compile()
+    with pytest.raises(IncompatibleCompiledDocumentError, match='configuration'):
+        PortableTextRenderer(compiled)
+
+
+def test_compiled_document_version_mismatch(monkeypatch):
+    data = PortableTextRenderer([]).compile().dumps()
+    monkeypatch.setattr('portabletext_html.compiled.get_library_version', lambda: '0.0.1')
+    with pytest.raises(IncompatibleCompiledDocumentError, match='version'):
+        CompiledDocument.loads(data)
+
+
+def test_invalid_compiled_document():
+    with pytest.raises(IncompatibleCompiledDocumentError, match='Not a compiled'):
+        CompiledDocument.loads(b'{}\n{}\n{}')
+    with pytest.raises(TypeError, match='CompiledDocument'):
+        PortableTextRenderer('<p></p>')
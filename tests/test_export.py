@@ -0,0 +1,135 @@
+import gzip
+import json
+from unittest.mock import ANY
+
+import pytest
+
+from portabletext_html import export as export_module
+from portabletext_html.export import export, get_output_name, get_shard, main
+from tests.helpers import make_block
+
+
+def make_document(document_id: str, text: str) -> dict:
+    return {
+        '_id': document_id,
+        '_type': 'post',
+        'body': [make_block(text, marks=[], markDefs=[])],
+    }
+
+
+@pytest.fixture()
+def source(tmp_path):
+    path = tmp_path / 'documents.ndjson'
+    documents = [make_document(f'post-{index}', f'Post {index}') for index in range(10)]
+    path.write_text('\n'.join(json.dumps(document) for document in documents) + '\n')
+    return path
+
+
+def test_export(source, tmp_path):
+    output_dir = tmp_path / 'out'
+    result = export(source, output_dir, batch_size=3)
+    assert (result.rendered, result.skipped, result.failed) == (10, 0, {})
+    assert (output_dir / 'post-3.html').read_text() == '<p>Post 3</p>'
+    manifest = json.loads((output_dir / 'manifest-0-of-1.json').read_text())
+    assert sorted(manifest['documents']) == sorted(f'post-{index}' for index in range(10))
+
+
+def test_rerun_skips_unchanged_documents(source, tmp_path):
+    output_dir = tmp_path / 'out'
+    export(source, output_dir)
+    assert export(source, output_dir).skipped == 10
+
+    lines = source.read_text().splitlines()
+    lines[4] = json.dumps(make_document('post-4', 'Edited'))
+    source.write_text('\n'.join(lines))
+    (output_dir / 'post-7.html').unlink()
+
+    result = export(source, output_dir)
+    assert (result.rendered, result.skipped) == (2, 8)
+    assert (output_dir / 'post-4.html').read_text() == '<p>Edited</p>'
+
+    # a different renderer configuration renders everything again
+    assert export(source, output_dir, coalesce_spans=True).rendered == 10
+
+
+def test_resume_after_interruption(source, tmp_path, monkeypatch):
+    output_dir = tmp_path / 'out'
+    render_content = export_module._render_content
+    calls = []
+
+    def interrupted(content, renderer_options, compression):
+        calls.append(content)
+        if len(calls) == 5:
+            raise KeyboardInterrupt
+        return render_content(content, renderer_options, compression)
+
+    monkeypatch.setattr(export_module, '_render_content', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        export(source, output_dir, batch_size=2)
+    monkeypatch.undo()
+
+    result = export(source, output_dir, batch_size=2)
+    assert (result.rendered, result.skipped) == (6, 4)
+    assert not list(output_dir.glob('*.tmp'))
+
+
+def test_shards_partition_documents(source, tmp_path):
+    results = [export(source, tmp_path / 'out', shard=shard, shards=3) for shard in range(3)]
+    assert sum(result.rendered for result in results) == 10
+    assert len(list((tmp_path / 'out').glob('*.html'))) == 10
+    assert all(get_shard(f'post-{index}', 3) == get_shard(f'post-{index}', 3) for index in range(10))
+    assert {get_shard(f'post-{index}', 3) for index in range(100)} == {0, 1, 2}
+
+    with pytest.raises(ValueError, match='shard must be between'):
+        export(source, tmp_path / 'out', shard=3, shards=3)
+
+
+def test_failed_documents_are_retried(tmp_path):
+    source = tmp_path / 'documents.ndjson'
+    source.write_text(json.dumps({'_id': 'drafts.post/1', 'body': [{'_type': 'unknown'}]}) + '\n')
+    output_dir = tmp_path / 'out'
+
+    result = export(source, output_dir)
+    assert list(result.failed) == ['drafts.post/1']
+    assert export(source, output_dir).failed
+    assert get_output_name('drafts.post/1') == 'drafts.post%2F1.html'
+
+
+def test_render_errors_are_reported_per_document(tmp_path):
+    def image_serializer(node, context, list_item):
+        return node['url']
+
+    source = tmp_path / 'documents.ndjson'
+    documents = [
+        {'_id': 'post-1', 'body': [{'_type': 'image'}]},
+        {'_id': 'post-2', 'body': [make_block(style='h7')]},
+        {'_id': 'post-3', 'body': [{'_type': 'block', 'children': [{'_type': 'span'}]}]},
+        {'_id': 'post-4', 'body': [make_block('Post 4')]},
+    ]
+    source.write_text(''.join(json.dumps(document) + '\n' for document in documents))
+
+    result = export(source, tmp_path / 'out', custom_serializers={'image': image_serializer})
+    assert result.failed == {'post-1': "KeyError: 'url'", 'post-2': "KeyError: 'h7'", 'post-3': ANY}
+    assert result.failed['post-3'].startswith('TypeError: ')
+    assert result.rendered == 1
+    assert (tmp_path / 'out' / 'post-4.html').read_text() == '<p>Post 4</p>'
+
+
+def test_export_command(source, tmp_path, capsys):
+    assert main([str(source), str(tmp_path / 'out'), '--batch-size', '4']) == 0
+    assert capsys.readouterr().out == 'rendered: 10, skipped: 0, failed: 0\n'
+    assert main([str(tmp_path / 'missing.ndjson'), str(tmp_path / 'out')]) == 2
+
+
+def test_export_with_workers(source, tmp_path):
+    result = export(source, tmp_path / 'out', batch_size=4, workers=2)
+    assert result.rendered == 10
+    assert (tmp_path / 'out' / 'post-9.html').read_text() == '<p>Post 9</p>'
+
+
+def test_compressed_export(source, tmp_path):
+    output_dir = tmp_path / 'out'
+    assert export(source, output_dir, compression='gzip').rendered == 10
+    assert gzip.decompress((output_dir / 'post-3.html.gz').read_bytes()) == b'<p>Post 3</p>'
+    assert export(source, output_dir, compression='gzip').skipped == 10
+    assert export(source, output_dir).rendered == 10  # plain HTML files are written separately
@@ -0,0 +1,54 @@
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.limits import RenderLimitExceededError, RenderLimits
+from tests.helpers import make_block
+
+
+def assert_limit(blocks, limit: str, **limits):
+    with pytest.raises(RenderLimitExceededError) as exc_info:
+        PortableTextRenderer(blocks, limits=RenderLimits(**limits)).render()
+    assert exc_info.value.limit == limit
+
+
+def test_within_limits():
+    limits = RenderLimits(
+        max_list_depth=2,
+        max_spans_per_block=1,
+        max_mark_defs_per_block=0,
+        max_nodes=4,
+        max_output_length=100,
+        time_budget=10,
+    )
+    blocks = [
+        make_block('a', _key='a', listItem='bullet', level=1),
+        make_block('b', _key='b', listItem='bullet', level=2),
+    ]
+    assert PortableTextRenderer(blocks, limits=limits).render() == '<div><ul><li>a<ul><li>b</li></ul></li></ul></div>'
+
+
+def test_max_list_depth():
+    blocks = [make_block(str(level), _key=str(level), listItem='bullet', level=level) for level in range(1, 1000)]
+    assert_limit(blocks, 'max_list_depth', max_list_depth=10)
+
+
+def test_max_spans_per_block():
+    blocks = {'_type': 'block', 'children': [{'_type': 'span', 'text': 'a'}] * 1000}
+    assert_limit(blocks, 'max_spans_per_block', max_spans_per_block=100)
+
+
+def test_max_mark_defs_per_block():
+    mark_defs = [{'_type': 'link', '_key': str(i), 'href': '#'} for i in range(100)]
+    assert_limit(make_block(markDefs=mark_defs), 'max_mark_defs_per_block', max_mark_defs_per_block=10)
+
+
+def test_max_nodes():
+    assert_limit([make_block(str(i)) for i in range(10)], 'max_nodes', max_nodes=15)
+
+
+def test_max_output_length():
+    assert_limit([make_block('x' * 100) for _ in range(10)], 'max_output_length', max_output_length=500)
+
+
+def test_time_budget():
+    assert_limit([make_block(str(i)) for i in range(10)], 'time_budget', time_budget=-1)
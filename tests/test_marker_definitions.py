@@ -1,11 +1,15 @@
 # pylint: skip-file
-from typing import Type
+from typing import Optional, Type
+
+import pytest
 
 from portabletext_html import PortableTextRenderer
+from portabletext_html.compiled import IncompatibleCompiledDocumentError
 from portabletext_html.marker_definitions import (
     CommentMarkerDefinition,
     EmphasisMarkerDefinition,
     LinkMarkerDefinition,
+    MarkerDefinition,
     StrikeThroughMarkerDefinition,
     StrongMarkerDefinition,
     UnderlineMarkerDefinition,
@@ -99,3 +103,97 @@ def test_custom_marker_definition():
     )
     result = renderer.render()
     assert result == '<p><em style="display: none">Sanity</em></p>'
+
+
+def test_custom_marker_instance():
+    setups = []
+
+    class RewritingLinkMarkerDefinition(MarkerDefinition):
+        tag = 'a'
+
+        def __init__(self, routes: dict) -> None:
+            setups.append(routes)
+            self.routes = routes
+
+        def render_prefix(self, span: Span, marker: str, context: Block) -> str:
+            href = next((md['href'] for md in context.markDefs if md['_key'] == marker), '')
+            return f'<a href="{self.routes.get(href, href)}">'
+
+    link = RewritingLinkMarkerDefinition({'/old': '/new'})
+    renderer = PortableTextRenderer(
+        blocks={
+            '_type': 'block',
+            'children': [
+                {'_key': 'a', '_type': 'span', 'marks': ['l1'], 'text': 'one'},
+                {'_key': 'b', '_type': 'span', 'marks': [], 'text': ' '},
+                {'_key': 'c', '_type': 'span', 'marks': ['l2'], 'text': 'two'},
+            ],
+            'markDefs': [
+                {'_key': 'l1', '_type': 'link', 'href': '/old'},
+                {'_key': 'l2', '_type': 'link', 'href': '/x'},
+            ],
+        },
+        custom_marker_definitions={'link': link},
+    )
+    assert renderer.render() == '<p><a href="/new">one</a> <a href="/x">two</a></p>'
+    assert len(setups) == 1
+
+
+def test_custom_marker_class_is_instantiated_once_per_renderer():
+    instances = []
+
+    class CountingEmphasis(MarkerDefinition):
+        tag = 'em'
+
+        def __init__(self) -> None:
+            instances.append(self)
+
+    block = {
+        '_type': 'block',
+        'children': [
+            {'_key': 'a', '_type': 'span', 'marks': ['em'], 'text': 'one'},
+            {'_key': 'b', '_type': 'span', 'marks': [], 'text': ' '},
+            {'_key': 'c', '_type': 'span', 'marks': ['em'], 'text': 'two'},
+        ],
+        'markDefs': [],
+    }
+    renderer = PortableTextRenderer(blocks=[block, block], custom_marker_definitions={'em': CountingEmphasis})
+    assert renderer.render() == '<div><p><em>one</em> <em>two</em></p><p><em>one</em> <em>two</em></p></div>'
+    assert len(instances) == 1
+
+
+def test_custom_serializer_instance():
+    class Counter:
+        def __init__(self, prefix: str) -> None:
+            self.prefix = prefix
+
+        def __call__(self, node: dict, context: Optional[Block], list_item: bool) -> str:
+            return f'<span>{self.prefix}{node["value"]}</span>'
+
+    renderer = PortableTextRenderer(
+        blocks={'_type': 'counter', 'value': 3}, custom_serializers={'counter': Counter('#')}
+    )
+    assert renderer.render() == '<span>#3</span>'
+
+
+def test_custom_instance_cache_key():
+    class RewritingLinkMarkerDefinition(MarkerDefinition):
+        tag = 'a'
+
+        def __init__(self, routes: dict) -> None:
+            self.routes = routes
+            self.cache_key = routes
+
+    def fingerprint(routes: dict) -> str:
+        return PortableTextRenderer(
+            [], custom_marker_definitions={'link': RewritingLinkMarkerDefinition(routes)}
+        )._stable_config_fingerprint()
+
+    assert fingerprint({'/old': '/new'}) == fingerprint({'/old': '/new'})
+    assert fingerprint({'/old': '/new'}) != fingerprint({'/old': '/newer'})
+
+    compiled = PortableTextRenderer(
+        [], custom_marker_definitions={'link': RewritingLinkMarkerDefinition({'/old': '/new'})}
+    ).compile()
+    with pytest.raises(IncompatibleCompiledDocumentError):
+        PortableTextRenderer(compiled, custom_marker_definitions={'link': RewritingLinkMarkerDefinition({})})
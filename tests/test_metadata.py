@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.cache import FragmentCache
+from portabletext_html.metadata import Heading
+from portabletext_html.utils import slugify
+from tests.helpers import make_block
+
+
+def test_render_with_metadata():
+    blocks = [
+        make_block('Getting started', style='h1'),
+        {
+            '_type': 'block',
+            'children': [
+                {'_type': 'span', 'text': 'Read the ', 'marks': []},
+                {'_type': 'span', 'text': 'docs', 'marks': ['docs']},
+                {'_type': 'span', 'text': ' first.', 'marks': []},
+            ],
+            'markDefs': [{'_type': 'link', '_key': 'docs', 'href': 'https://example.com/docs'}],
+        },
+        make_block('Usage', style='h2'),
+        make_block('One item', _key='item', listItem='bullet', level=1),
+        make_block('Usage', style='h2'),
+    ]
+    result = PortableTextRenderer(blocks).render_with_metadata()
+
+    assert result.html == (
+        '<div><h1 id="getting-started">Getting started</h1>'
+        '<p>Read the <a href="https://example.com/docs">docs</a> first.</p>'
+        '<h2 id="usage">Usage</h2><ul><li>One item</li></ul><h2 id="usage-2">Usage</h2></div>'
+    )
+    assert result.metadata.headings == [
+        Heading(level=1, text='Getting started', anchor='getting-started'),
+        Heading(level=2, text='Usage', anchor='usage'),
+        Heading(level=2, text='Usage', anchor='usage-2'),
+    ]
+    assert result.metadata.links == ['https://example.com/docs']
+    assert result.metadata.word_count == 10
+    assert result.metadata.reading_time == 1
+
+
+def test_links_are_collected_once_in_document_order():
+    hrefs = ['https://example.com/b', 'https://example.com/a', 'https://example.com/b']
+    blocks = [
+        make_block('link', marks=[str(index)], markDefs=[{'_type': 'link', '_key': str(index), 'href': href}])
+        for index, href in enumerate(hrefs)
+    ]
+    assert PortableTextRenderer(blocks).render_with_metadata().metadata.links == hrefs[:2]
+
+
+def test_render_without_metadata_is_unchanged():
+    renderer = PortableTextRenderer(make_block('Usage', style='h2'))
+    assert renderer.render_with_metadata().html == '<h2 id="usage">Usage</h2>'
+    assert renderer.render() == '<h2>Usage</h2>'
+
+
+def test_metadata_bypasses_fragment_cache():
+    cache = FragmentCache()
+    blocks = [make_block('Usage', style='h2'), make_block('Text')]
+    PortableTextRenderer(blocks, fragment_cache=cache).render()
+    result = PortableTextRenderer(blocks, fragment_cache=cache).render_with_metadata()
+
+    assert result.html == '<div><h2 id="usage">Usage</h2><p>Text</p></div>'
+    assert result.metadata.word_count == 2
+    assert cache.stats.hits == 0
+
+
+def test_metadata_for_upstream_fixture():
+    fixture = json.loads((Path(__file__).parent / 'fixtures/upstream/017-all-default-block-styles.json').read_text())
+    result = PortableTextRenderer(fixture['input']).render_with_metadata()
+    assert [heading.level for heading in result.metadata.headings] == [1, 2, 3, 4, 5, 6]
+
+
+def test_slugify():
+    assert slugify('Hello, World!') == 'hello-world'
+    assert slugify('Æ Ø Å') == 'æ-ø-å'
+    assert slugify('snake_case') == 'snake-case'
+    assert slugify('!!!') == 'section'
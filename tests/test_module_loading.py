@@ -1,4 +1,38 @@
 """Smoke tests for the library."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Import and first render of a small document in a fresh interpreter. This typically takes
+# around 50 ms; the budget leaves room for slow CI machines while catching heavy new imports.
+COLD_START_BUDGET = 0.5
+
+COLD_START_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+from portabletext_html import PortableTextRenderer
+imported = time.perf_counter()
+html = PortableTextRenderer(
+    [{"_type": "block", "children": [{"_type": "span", "text": "Hello", "marks": ["em"]}], "markDefs": []}]
+).render()
+rendered = time.perf_counter()
+modules = list(sys.modules)
+import json
+print(json.dumps({"import": imported - start, "render": rendered - imported, "html": html, "modules": modules}))
+'''
+
+# Optional subsystems that should only be imported when they are used
+LAZY_MODULES = [
+    'concurrent.futures',
+    'hashlib',
+    'json.decoder',
+    'portabletext_html.cache',
+    'portabletext_html.compiled',
+    'portabletext_html.decoding',
+    'portabletext_html.metadata',
+    'portabletext_html.streaming',
+]
 
 
 def test_module_should_be_importable():
@@ -9,3 +43,37 @@ def test_module_should_be_importable():
     from portabletext_html import PortableTextRenderer
 
     assert PortableTextRenderer
+
+
+def run_cold_start() -> dict:
+    result = subprocess.run(
+        [sys.executable, '-c', COLD_START_SCRIPT],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_cold_start():
+    """Test that importing the package and rendering a first document stays cheap."""
+    timings = [run_cold_start() for _ in range(3)]
+    assert timings[0]['html'] == '<p><em>Hello</em></p>'
+    assert min(timing['import'] + timing['render'] for timing in timings) < COLD_START_BUDGET
+    assert not set(LAZY_MODULES) & set(timings[0]['modules'])
+
+
+def test_importing_submodules_does_not_import_renderer():
+    result = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'import sys, portabletext_html.decoding; print("portabletext_html.renderer" in sys.modules)',
+        ],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        text=True,
+    )
+    assert result.stdout.strip() == 'False'
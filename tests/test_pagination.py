@@ -0,0 +1,93 @@
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.cache import FragmentCache
+from tests.helpers import make_block
+
+BLOCKS = [
+    make_block('Intro', _key='p'),
+    make_block('one', _key='a', listItem='number', level=1),
+    make_block('two', _key='b', listItem='number', level=1),
+    make_block('two.a', _key='c', listItem='number', level=2),
+    make_block('two.b', _key='d', listItem='number', level=2),
+    make_block('three', _key='e', listItem='number', level=1),
+    make_block('bullet', _key='f', listItem='bullet', level=1),
+    make_block('Outro', _key='q'),
+]
+
+
+def test_render_range_continues_numbered_lists():
+    renderer = PortableTextRenderer(BLOCKS)
+    assert renderer.render_range(2, 4) == '<ol start="2"><li>two<ol><li>two.a</li></ol></li></ol>'
+    assert renderer.render_range(4, 7) == (
+        '<ol start="2"><li>two.b</li></ol><ol start="3"><li>three</li></ol><ul><li>bullet</li></ul>'
+    )
+
+
+MIXED_LEVELS = [
+    make_block('one', _key='a', listItem='number', level=1),
+    make_block('one.a', _key='b', listItem='bullet', level=2),
+    make_block('one.b', _key='c', listItem='number', level=2),
+    make_block('two', _key='d', listItem='number', level=1),
+]
+
+
+@pytest.mark.parametrize('blocks', [BLOCKS, MIXED_LEVELS], ids=['blocks', 'mixed_levels'])
+def test_render_range_matches_render_for_whole_document(blocks):
+    renderer = PortableTextRenderer(blocks)
+    assert f'<div>{renderer.render_range(0, len(blocks))}</div>' == renderer.render()
+
+
+def test_list_ordinals_follow_list_grouping():
+    assert PortableTextRenderer(MIXED_LEVELS)._get_list_ordinals() == [1, 1, 1, 1]
+    assert PortableTextRenderer(BLOCKS)._get_list_ordinals() == [0, 1, 2, 1, 2, 3, 1, 0]
+
+
+def test_iter_pages():
+    pages = list(PortableTextRenderer(BLOCKS).iter_pages(3))
+    assert pages == [
+        '<p>Intro</p><ol><li>one</li><li>two</li></ol>',
+        '<ol><li>two.a</li><li>two.b</li></ol><ol start="3"><li>three</li></ol>',
+        '<ul><li>bullet</li></ul><p>Outro</p>',
+    ]
+
+
+def test_list_ordinals_reset():
+    blocks = [
+        make_block('a', _key='a', listItem='number', level=1),
+        make_block('b', _key='b', listItem='bullet', level=1),
+        make_block('c', _key='c', listItem='number', level=1),
+        make_block('p', _key='p'),
+        make_block('d', _key='d', listItem='number', level=1),
+    ]
+    assert PortableTextRenderer(blocks)._get_list_ordinals() == [1, 1, 1, 0, 1]
+
+
+def test_render_range_errors():
+    renderer = PortableTextRenderer(BLOCKS)
+    assert renderer.render_range(100, 200) == ''
+    with pytest.raises(ValueError, match='page_size'):
+        list(renderer.iter_pages(0))
+    with pytest.raises(ValueError, match='compiled'):
+        PortableTextRenderer(renderer.compile()).render_range(0, 1)
+    with pytest.raises(ValueError, match='compiled'):
+        list(PortableTextRenderer(renderer.compile()).iter_pages(3))
+
+
+def test_render_range_does_not_leak_list_starts_into_fragment_cache():
+    cache = FragmentCache()
+    blocks = [
+        make_block('one', _key='a', listItem='number', level=1),
+        make_block('two', _key='b', listItem='number', level=1),
+        make_block('three', _key='c', listItem='number', level=1),
+    ]
+    assert PortableTextRenderer(blocks, fragment_cache=cache).render_range(1, 3) == (
+        '<ol start="2"><li>two</li><li>three</li></ol>'
+    )
+    other = [
+        make_block('two', _key='x', listItem='number', level=1),
+        make_block('three', _key='y', listItem='number', level=1),
+    ]
+    assert (
+        PortableTextRenderer(other, fragment_cache=cache).render() == '<div><ol><li>two</li><li>three</li></ol></div>'
+    )
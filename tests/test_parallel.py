@@ -0,0 +1,78 @@
+import copy
+import pickle
+import time
+from typing import Optional
+
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.limits import RenderLimitExceededError, RenderLimits
+from portabletext_html.profiling import RenderProfile
+from portabletext_html.types import Block
+from tests.helpers import make_block
+
+
+def slow_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+    time.sleep(0.02)
+    if 'calls' in node:
+        with open(node['calls'], 'a') as f:  # counted through a file, which works across processes
+            f.write('.')
+    return ''
+
+
+def test_parallel_matches_sequential(upstream_blocks, serializers):
+    sequential = PortableTextRenderer(copy.deepcopy(upstream_blocks), custom_serializers=serializers).render()
+    parallel = PortableTextRenderer(upstream_blocks, custom_serializers=serializers).render_parallel(
+        max_workers=4, partition_size=1
+    )
+    assert parallel == sequential
+
+
+@pytest.mark.parametrize('use_processes', [False, True])
+def test_parallel_large_document(use_processes, upstream_documents, serializers):
+    blocks = []
+    for document in upstream_documents:
+        blocks.extend(document if isinstance(document, list) else [document])
+    blocks = [block for block in blocks if block.get('_type') in ('block', *serializers)] * 5
+    renderer = PortableTextRenderer(blocks, custom_serializers=serializers)
+    assert renderer.render_parallel(max_workers=2, use_processes=use_processes) == renderer.render()
+
+
+def test_parallel_limits():
+    blocks = [make_block('x' * 100)] * 10
+    renderer = PortableTextRenderer(blocks, limits=RenderLimits(max_output_length=500))
+    with pytest.raises(RenderLimitExceededError):
+        renderer.render_parallel(max_workers=2)
+
+
+@pytest.mark.parametrize('use_processes', [False, True])
+def test_parallel_limits_fail_fast(use_processes, tmp_path):
+    calls = tmp_path / 'calls'
+    blocks = [{'_type': 'block', 'children': [{'_type': 'slow', 'calls': str(calls)}]}] * 100
+    renderer = PortableTextRenderer(
+        blocks, custom_serializers={'slow': slow_serializer}, limits=RenderLimits(time_budget=0.2)
+    )
+    with pytest.raises(RenderLimitExceededError) as error:
+        renderer.render_parallel(max_workers=2, use_processes=use_processes, partition_size=10)
+    assert error.value.limit == 'time_budget'
+    # Remaining partitions are cancelled and running ones stop at the deadline, so not every node is rendered
+    assert len(calls.read_text()) < len(blocks)
+
+    blocks = [make_block('x' * 100)] * 10
+    renderer = PortableTextRenderer(blocks, limits=RenderLimits(max_output_length=500))
+    with pytest.raises(RenderLimitExceededError, match='500 characters'):
+        renderer.render_parallel(max_workers=2, use_processes=use_processes, partition_size=2)
+
+
+def test_render_limit_errors_are_picklable():
+    error = pickle.loads(pickle.dumps(RenderLimitExceededError('time_budget', 'Rendering exceeded its time budget')))
+    assert (error.limit, str(error)) == ('time_budget', 'Rendering exceeded its time budget')
+
+
+def test_parallel_rejects_profiling():
+    with pytest.raises(ValueError, match='not supported'):
+        PortableTextRenderer([], profile=RenderProfile()).render_parallel()
+
+
+def test_parallel_empty_document():
+    assert PortableTextRenderer([]).render_parallel() == ''
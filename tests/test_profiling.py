@@ -0,0 +1,95 @@
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.codegen import compile_renderer
+from portabletext_html.profiling import RenderCounters, RenderProfile
+from portabletext_html.types import Block, Span
+
+
+def make_document(blocks: int, spans: int) -> list:
+    document = []
+    for block_index in range(blocks):
+        children, mark_defs = [], []
+        for index in range(spans):
+            marks = ['strong'] if index % 3 == 0 else [f'link{index}'] if index % 3 == 1 else []
+            children.append({'_key': f's{index}', '_type': 'span', 'marks': marks, 'text': f'text {index} '})
+            if index % 3 == 1:
+                mark_defs.append({'_key': f'link{index}', '_type': 'link', 'href': f'/page/{index}'})
+        document.append({'_key': f'b{block_index}', '_type': 'block', 'children': children, 'markDefs': mark_defs})
+    document.append({'_key': 'l1', '_type': 'block', 'listItem': 'bullet', 'children': children, 'markDefs': mark_defs})
+    return document
+
+
+def count(document: list, renderer_class: type = PortableTextRenderer, **options) -> dict:
+    counters = RenderCounters()
+    renderer_class(document, counters=counters, **options).render()
+    return counters.as_dict()
+
+
+def test_counters():
+    counters = count(make_document(blocks=2, spans=3))
+    assert counters == {
+        'blocks': 5,  # two blocks, the list, its item and the context of the list
+        'spans': 9,
+        'sibling_lookups': 9,
+        'sibling_scan_steps': 9,
+        'mark_def_lookups': 3,
+        'mark_def_scan_steps': 3,
+        'marker_calls': 18,
+        'escape_calls': 3,
+        'output_chars': counters['output_chars'],
+    }
+    assert counters['output_chars'] > len(PortableTextRenderer(make_document(blocks=2, spans=3)).render())
+
+
+@pytest.mark.parametrize('options', [{}, {'escape_strategy': 'per_span'}, {'coalesce_spans': True}])
+def test_render_cost_is_linear_in_spans_per_block(options):
+    small, large = count(make_document(5, 30), **options), count(make_document(5, 60), **options)
+    for name in ('spans', 'sibling_lookups', 'sibling_scan_steps', 'mark_def_lookups', 'mark_def_scan_steps'):
+        assert large[name] == 2 * small[name], name
+    assert large['marker_calls'] == 2 * small['marker_calls']
+    assert large['output_chars'] <= 2.2 * small['output_chars']  # span texts get longer with the index
+
+
+def test_render_cost_is_linear_in_blocks():
+    small, medium, large = count(make_document(10, 30)), count(make_document(20, 30)), count(make_document(30, 30))
+    for name in ('sibling_scan_steps', 'mark_def_scan_steps', 'marker_calls', 'escape_calls'):
+        assert large[name] - medium[name] == medium[name] - small[name], name
+
+
+@pytest.mark.parametrize('options', [{}, {'escape_strategy': 'per_span'}])
+def test_counters_with_specialized_renderer(options):
+    document = make_document(3, 9)
+    specialized, generic = count(document, compile_renderer(), **options), count(document, **options)
+    for name in ('spans', 'sibling_scan_steps', 'mark_def_lookups', 'marker_calls', 'escape_calls', 'output_chars'):
+        assert specialized[name] == generic[name], name
+    assert specialized['marker_calls'] > 0
+    # Unmarked spans skip the sibling lookup in the specialized renderer
+    assert specialized['sibling_lookups'] < generic['sibling_lookups']
+
+
+def test_sibling_lookup_uses_first_child_with_text():
+    children = [
+        {'_type': 'span', 'text': 'a', 'marks': []},
+        {'_type': 'span', 'text': 'b', 'marks': ['em']},
+        {'_type': 'span', 'text': 'a', 'marks': ['strong']},
+    ]
+    block = Block(_type='block', children=children)
+    assert block.get_node_siblings(Span(_type='span', text='a')) == (None, children[1])
+    assert block.get_node_siblings(Span(_type='span', text='b')) == (children[0], children[2])
+    assert block.get_node_siblings(Span(_type='span', text='missing')) == (None, None)
+
+
+def test_parallel_rendering_does_not_support_counters():
+    renderer = PortableTextRenderer(make_document(2, 3), counters=RenderCounters())
+    with pytest.raises(ValueError, match='not supported'):
+        renderer.render_parallel()
+
+
+def test_profile_report():
+    profile = RenderProfile()
+    counters = RenderCounters()
+    PortableTextRenderer(make_document(2, 3), profile=profile, counters=counters).render()
+    assert profile.timings['span'].count == 9
+    assert counters.escape_calls == 3  # profiled renders escape span texts in batches, like default renders
+    assert profile.report().splitlines()[0].split()[:2] == ['node', 'type']
@@ -0,0 +1,100 @@
+from typing import Optional
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.cache import FragmentCache, SerializerCache
+from portabletext_html.marker_definitions import MarkerDefinition
+from portabletext_html.references import collect_reference_ids, resolve_references
+from portabletext_html.types import Block, Span
+
+
+class InternalLinkMarkerDefinition(MarkerDefinition):
+    tag = 'a'
+
+    @classmethod
+    def render_prefix(cls, span: Span, marker: str, context: Block) -> str:
+        mark_def = next(md for md in context.markDefs if md['_key'] == marker)
+        slug = context.references.get(mark_def['reference']['_ref'], {}).get('slug', '#')
+        return f'<a href="/{slug}">'
+
+
+def reference_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+    title = context.references[node['_ref']]['title']
+    return f'<cite>{title}</cite>'
+
+
+def get_document(ref: str) -> list:
+    return [
+        {
+            '_key': 'b1',
+            '_type': 'block',
+            'children': [
+                {'_key': 's1', '_type': 'span', 'marks': ['l1'], 'text': 'Read'},
+                {'_key': 's2', '_type': 'reference', '_ref': 'author-1'},
+            ],
+            'markDefs': [{'_key': 'l1', '_type': 'internalLink', 'reference': {'_type': 'reference', '_ref': ref}}],
+        },
+        {'_key': 'b2', '_type': 'block', 'children': [{'_key': 's3', '_type': 'span', 'text': 'plain'}]},
+    ]
+
+
+OPTIONS = {
+    'custom_marker_definitions': {'internalLink': InternalLinkMarkerDefinition},
+    'custom_serializers': {'reference': reference_serializer},
+}
+
+
+def test_collect_reference_ids():
+    documents = [get_document('post-1'), get_document('post-2')]
+    assert collect_reference_ids(documents) == {'post-1', 'post-2', 'author-1'}
+    assert collect_reference_ids([{'_type': 'block', 'children': []}]) == set()
+
+
+def test_resolve_references_calls_resolver_once():
+    calls = []
+
+    def resolver(ids):
+        calls.append(ids)
+        return {'post-1': {'slug': 'first'}}
+
+    references = resolve_references([get_document('post-1'), get_document('post-2')], resolver)
+    assert calls == [['author-1', 'post-1', 'post-2']]
+    assert references == {'post-1': {'slug': 'first'}}
+
+    assert resolve_references([[{'_type': 'block', 'children': []}]], resolver) == {}
+    assert len(calls) == 1
+
+
+def test_render_with_references():
+    references = {'post-1': {'slug': 'first'}, 'author-1': {'title': 'Ada'}}
+    renderer = PortableTextRenderer(get_document('post-1'), references=references, **OPTIONS)
+    assert renderer.render() == '<div><p><a href="/first">Read</a><cite>Ada</cite></p><p>plain</p></div>'
+
+
+def test_cached_render_depends_on_references():
+    fragment_cache, serializer_cache = FragmentCache(), SerializerCache()
+    results = [
+        PortableTextRenderer(
+            get_document('post-1'),
+            references={'post-1': {'slug': slug}, 'author-1': {'title': title}},
+            fragment_cache=fragment_cache,
+            serializer_cache=serializer_cache,
+            **OPTIONS,
+        ).render()
+        for slug, title in [('first', 'Ada'), ('renamed', 'Grace'), ('first', 'Ada')]
+    ]
+    assert results[0] == results[2]
+    assert results[1] == '<div><p><a href="/renamed">Read</a><cite>Grace</cite></p><p>plain</p></div>'
+    assert fragment_cache.stats.hits == 3  # the plain block twice, the linking block only for equal references
+
+
+def test_top_level_serializers_receive_references():
+    references = {'author-1': {'title': 'Ada'}}
+    document = [{'_key': 'r1', '_type': 'reference', '_ref': 'author-1'}, get_document('post-1')[1]]
+    renderer = PortableTextRenderer(document, references=references, serializer_cache=SerializerCache(), **OPTIONS)
+    assert renderer.render() == '<div><cite>Ada</cite><p>plain</p></div>'
+
+    def top_level_serializer(node: dict, context: Optional[Block], list_item: bool) -> str:
+        return 'top-level' if context is None else 'nested'
+
+    renderer = PortableTextRenderer({'_type': 'reference'}, custom_serializers={'reference': top_level_serializer})
+    assert renderer.render() == 'top-level'
@@ -1,12 +1,18 @@
+import copy
 import html
 import json
+import random
+import sys
+import types
 from pathlib import Path
 from typing import Optional
 
 import pytest
 
-from portabletext_html.renderer import MissingSerializerError, UnhandledNodeError, render
+from portabletext_html.decoding import get_decoder
+from portabletext_html.renderer import MissingSerializerError, UnhandledNodeError, render, render_json
 from portabletext_html.types import Block
+from portabletext_html.utils import coalesce_spans, escape_span_texts
 
 
 def extraInfoSerializer(node: dict, context: Optional[Block], list_item: bool) -> str:
@@ -74,3 +80,183 @@ def test_custom_serializer_node_after_list():
     output = render(fixture, custom_serializers={'extraInfoBlock': extraInfoSerializer})
 
     assert output == '<div><ul><li>resers</li></ul><p>This informations is not supported by Block</p></div>'
+
+
+def test_coalesce_spans():
+    block = {
+        '_type': 'block',
+        'children': [
+            {'_type': 'span', 'marks': ['strong'], 'text': 'A '},
+            {'_type': 'span', 'marks': ['strong'], 'text': 'word '},
+            {'_type': 'span', 'marks': ['strong'], 'text': 'of '},
+            {'_type': 'span', 'marks': ['strong'], 'text': 'warning;'},
+            {'_type': 'span', 'marks': [], 'text': ' Sanity is'},
+            {'_type': 'span', 'marks': [], 'text': ' addictive.'},
+        ],
+        'markDefs': [],
+    }
+    original = copy.deepcopy(block)
+    children = coalesce_spans(block['children'])
+
+    # The first span of a marked run is kept, since only that one renders through the marker definitions
+    assert [child['text'] for child in children] == ['A ', 'word of warning;', ' Sanity is addictive.']
+    assert block == original  # input must not be mutated
+    assert render(block, coalesce_spans=True) == render(block)
+
+
+def test_coalesce_spans_drops_empty_continuations_and_keeps_inline_objects():
+    children = [
+        {'_type': 'span', 'marks': ['em', 'strong'], 'text': 'a'},
+        {'_type': 'span', 'marks': ['em', 'strong'], 'text': ''},
+        {'_type': 'span', 'marks': [], 'text': 'b'},
+        {'_type': 'button', 'text': 'c'},
+        {'_type': 'span', 'marks': [], 'text': 'd'},
+        {'_type': 'span', 'marks': [], 'text': 'e'},
+    ]
+    assert coalesce_spans(children) == [
+        {'_type': 'span', 'marks': ['em', 'strong'], 'text': 'a'},
+        {'_type': 'span', 'marks': [], 'text': 'b'},
+        {'_type': 'button', 'text': 'c'},
+        {'_type': 'span', 'marks': [], 'text': 'de'},
+    ]
+
+
+def test_coalesce_spans_skips_repeated_texts():
+    children = [
+        {'_type': 'span', 'marks': ['em'], 'text': 'a'},
+        {'_type': 'span', 'marks': ['em'], 'text': 'b'},
+        {'_type': 'span', 'marks': ['em'], 'text': 'c'},
+        {'_type': 'span', 'marks': [], 'text': 'bc'},
+    ]
+    assert coalesce_spans(children) == children  # 'bc' would repeat
+    assert coalesce_spans([*children[:3], children[0]]) == [*children[:3], children[0]]
+
+
+def test_coalesce_spans_matches_uncoalesced_output(upstream_blocks, serializers):
+    expected = render(copy.deepcopy(upstream_blocks), custom_serializers=serializers)
+    assert render(upstream_blocks, coalesce_spans=True, custom_serializers=serializers) == expected
+
+
+@pytest.mark.parametrize(
+    'children',
+    [
+        [
+            {'_type': 'span', 'marks': ['strong'], 'text': '<script>'},
+            {'_type': 'span', 'marks': ['strong'], 'text': '<script>alert(1)</script>'},
+        ],
+        [
+            {'_type': 'span', 'marks': ['em'], 'text': 't0'},
+            {'_type': 'span', 'marks': ['strong'], 'text': 't1'},
+            {'_type': 'span', 'marks': ['strong'], 'text': 't2'},
+            {'_type': 'span', 'marks': ['strong'], 'text': 't3'},
+            {'_type': 'span', 'marks': ['em', 'strong'], 'text': 't4'},
+        ],
+        [
+            {'_type': 'span', 'marks': ['em'], 'text': 't0'},
+            {'_type': 'span', 'marks': ['strong'], 'text': 't1'},
+            {'_type': 'span', 'marks': ['strong'], 'text': ''},
+            {'_type': 'span', 'marks': ['em', 'strong'], 'text': 't2'},
+        ],
+    ],
+    ids=['escaping', 'mark_order', 'empty_spans'],
+)
+def test_coalesce_spans_keeps_escaping_and_mark_order(children):
+    block = {'_type': 'block', 'children': children, 'markDefs': []}
+    assert render(copy.deepcopy(block), coalesce_spans=True) == render(block)
+
+
+def test_coalesce_spans_fuzz():
+    rng = random.Random(0)
+    for _ in range(2000):
+        children = [
+            {
+                '_type': 'span',
+                'marks': rng.sample(['em', 'strong', 'code'], rng.randint(0, 2)),
+                # Texts are unique, since spans are told apart by their text
+                'text': rng.choice(['', f'<{i}>', f'a & {i}', f'"{i}"\n']),
+            }
+            for i in range(rng.randint(1, 8))
+        ]
+        block = {'_type': 'block', 'children': children, 'markDefs': []}
+        assert render(copy.deepcopy(block), coalesce_spans=True) == render(block), children
+
+
+def test_batched_escaping_matches_per_span_escaping():
+    serializers = {
+        'image': lambda node, context, list_item: '<img/>',
+        'button': lambda node, context, list_item: '<button/>',
+    }
+    for fixture_file in sorted((Path(__file__).parent / 'fixtures' / 'upstream').glob('0[0-2]*.json')):
+        blocks = json.loads(fixture_file.read_text())['input']
+        batched = render(copy.deepcopy(blocks), custom_serializers=serializers, escape_strategy='batched')
+        per_span = render(copy.deepcopy(blocks), custom_serializers=serializers, escape_strategy='per_span')
+        assert batched == per_span
+
+
+def test_escape_span_texts():
+    children = [
+        {'_type': 'span', 'text': '<b>\n'},
+        {'_type': 'image'},
+        {'_type': 'span', 'text': 'a & b'},
+    ]
+    assert escape_span_texts(children) == ['&lt;b&gt;<br/>', None, 'a &amp; b']
+
+    # Falls back to escaping each text when the batch separator is part of the text
+    children.append({'_type': 'span', 'text': '"\x00"'})
+    assert escape_span_texts(children) == ['&lt;b&gt;<br/>', None, 'a &amp; b', '&quot;\x00&quot;']
+
+
+def test_unknown_escape_strategy():
+    with pytest.raises(ValueError, match='Unknown escape strategy'):
+        render([], escape_strategy='regex')
+
+
+def test_nested_lists_do_not_mutate_input():
+    blocks = [
+        {'_type': 'block', '_key': 'a', 'listItem': 'bullet', 'level': 1, 'children': [{'_type': 'span', 'text': 'a'}]},
+        {'_type': 'block', '_key': 'b', 'listItem': 'bullet', 'level': 2, 'children': [{'_type': 'span', 'text': 'b'}]},
+    ]
+    original = copy.deepcopy(blocks)
+    expected = '<div><ul><li>a<ul><li>b</li></ul></li></ul></div>'
+
+    assert render(blocks) == expected
+    assert render(blocks) == expected
+    assert blocks == original
+
+
+def test_render_json():
+    data = (Path(__file__).parent / 'fixtures' / 'nested_marks.json').read_bytes()
+    expected = '<p><strong>A word of <em>warning;</em></strong> Sanity is addictive.</p>'
+    assert render_json(data) == expected
+    assert render_json(data.decode()) == expected
+
+
+def test_json_decoder_fallback(monkeypatch):
+    get_decoder.cache_clear()
+    monkeypatch.setitem(sys.modules, 'orjson', None)
+    monkeypatch.setitem(sys.modules, 'msgspec', None)
+    try:
+        assert get_decoder() is json.loads
+    finally:
+        get_decoder.cache_clear()
+
+
+def test_json_decoder_msgspec_errors(monkeypatch):
+    class DecodeError(Exception):
+        pass
+
+    def decode(data):
+        raise DecodeError('malformed')
+
+    msgspec = types.ModuleType('msgspec')
+    msgspec.DecodeError = DecodeError
+    msgspec.json = types.SimpleNamespace(decode=decode)
+
+    get_decoder.cache_clear()
+    monkeypatch.setitem(sys.modules, 'orjson', None)
+    monkeypatch.setitem(sys.modules, 'msgspec', msgspec)
+    try:
+        with pytest.raises(ValueError, match='malformed'):
+            render_json(b'{')
+    finally:
+        get_decoder.cache_clear()
@@ -0,0 +1,107 @@
+import functools
+import threading
+from typing import List
+
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.codegen import compile_renderer
+from portabletext_html.marker_definitions import MarkerDefinition
+from portabletext_html.shadow import ShadowRenderer, ShadowReport
+from tests.helpers import make_block
+
+
+def make_document(texts: List[str]) -> list:
+    return [make_block(text, marks=['em'], _key=f'b{index}', markDefs=[]) for index, text in enumerate(texts)]
+
+
+class LoudEmphasis(MarkerDefinition):
+    tag = 'em'
+
+    @classmethod
+    def render_text(cls, span, marker, context) -> str:
+        return str(span.text).upper() if span.text == 'two' else str(span.text)
+
+
+class BrokenRenderer(PortableTextRenderer):
+    def render(self) -> str:
+        raise RuntimeError('not ready')
+
+
+def test_matching_engine():
+    reports: List[ShadowReport] = []
+    shadow = ShadowRenderer(compile_renderer(), on_report=reports.append, sample_rate=1)
+    document = make_document(['one', 'two'])
+    assert shadow.render(document) == PortableTextRenderer(document).render()
+    shadow.close()
+
+    assert len(reports) == 1
+    assert reports[0].matched
+    assert reports[0].engine == 'SpecializedPortableTextRenderer'
+    assert reports[0].time_delta == reports[0].alternate_time - reports[0].reference_time
+
+
+def test_mismatch_reports_minimal_block():
+    reports: List[ShadowReport] = []
+    alternate = functools.partial(PortableTextRenderer, custom_marker_definitions={'em': LoudEmphasis})
+    shadow = ShadowRenderer(alternate, on_report=reports.append, sample_rate=1)
+    assert shadow.render(make_document(['one', 'two', 'three'])) == (
+        '<div><p><em>one</em></p><p><em>two</em></p><p><em>three</em></p></div>'
+    )
+    shadow.close()
+
+    mismatch = reports[0].mismatch
+    assert not reports[0].matched
+    assert (mismatch.block_index, mismatch.reference, mismatch.alternate) == (
+        1,
+        '<p><em>two</em></p>',
+        '<p><em>TWO</em></p>',
+    )
+
+
+def test_failing_engine_does_not_affect_callers():
+    reports: List[ShadowReport] = []
+    shadow = ShadowRenderer(BrokenRenderer, on_report=reports.append, sample_rate=1)
+    assert shadow.render(make_document(['one'])) == '<p><em>one</em></p>'
+    shadow.close()
+    assert reports[0].error == 'RuntimeError: not ready'
+    assert reports[0].time_delta is None
+
+
+def test_sampling():
+    reports: List[ShadowReport] = []
+    samples = iter([0.5, 0.05, 0.2, 0.01])
+    shadow = ShadowRenderer(
+        compile_renderer(), on_report=reports.append, sample_rate=0.1, sampler=lambda: next(samples)
+    )
+    for _ in range(4):
+        shadow.render(make_document(['one']))
+    shadow.close()
+    assert len(reports) == 2
+
+    with pytest.raises(ValueError, match='sample_rate'):
+        ShadowRenderer(compile_renderer(), on_report=reports.append, sample_rate=2)
+
+
+def test_samples_are_dropped_when_comparisons_fall_behind():
+    shadow = ShadowRenderer(compile_renderer(), on_report=lambda report: None, sample_rate=1, max_pending=0)
+    shadow.render(make_document(['one']))
+    shadow.close()
+    assert shadow.dropped == 1
+
+
+def test_comparison_uses_a_snapshot_of_the_document():
+    reports: List[ShadowReport] = []
+    started = threading.Event()
+
+    def alternate(blocks, **options):
+        started.wait(5)
+        return PortableTextRenderer(blocks, **options)
+
+    shadow = ShadowRenderer(alternate, on_report=reports.append, sample_rate=1)
+    document = make_document(['one'])
+    shadow.render(document)
+    document[0]['children'][0]['text'] = 'changed'
+    started.set()
+    shadow.close()
+    assert reports[0].matched
@@ -0,0 +1,56 @@
+import gzip
+import io
+import sys
+
+import pytest
+
+from portabletext_html import PortableTextRenderer
+from portabletext_html.streaming import strip_chunks, write_chunks
+from tests.helpers import INLINE_TYPES, make_block
+
+# Serializers with surrounding whitespace, which the output is stripped of
+SERIALIZERS = {name: lambda node, context, list_item: ' <br/> ' for name in INLINE_TYPES}
+
+
+def test_iter_render_matches_render(upstream_blocks):
+    expected = PortableTextRenderer(upstream_blocks, custom_serializers=SERIALIZERS).render()
+    assert ''.join(PortableTextRenderer(upstream_blocks, custom_serializers=SERIALIZERS).iter_render()) == expected
+
+
+@pytest.mark.parametrize(
+    'chunks',
+    [[], ['  ', '\n'], [' a ', ' ', 'b\n', ' '], ['a', '  ', '', 'b'], ['\n\na'], ['a\n\n']],
+)
+def test_strip_chunks(chunks):
+    assert ''.join(strip_chunks(chunks)) == ''.join(chunks).strip()
+
+
+def test_render_to():
+    blocks = [make_block(f'Block {index} – æøå', marks=[]) for index in range(5000)]
+    expected = PortableTextRenderer(blocks).render().encode()
+
+    output = io.BytesIO()
+    assert PortableTextRenderer(blocks).render_to(output) == len(expected)
+    assert output.getvalue() == expected
+
+    output = io.BytesIO()
+    assert PortableTextRenderer(blocks).render_to(output, compression='gzip') == len(expected)
+    assert gzip.decompress(output.getvalue()) == expected
+
+
+def test_brotli_compression():
+    brotli = pytest.importorskip('brotli')
+    output = io.BytesIO()
+    write_chunks(['<p>', 'text', '</p>'], output, compression='brotli')
+    assert brotli.decompress(output.getvalue()) == b'<p>text</p>'
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError, match='Unknown compression'):
+        write_chunks([], io.BytesIO(), compression='zstd')
+
+
+def test_brotli_not_installed(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'brotli', None)
+    with pytest.raises(ValueError, match='requires the brotli package'):
+        write_chunks([], io.BytesIO(), compression='brotli')